@@ -5,10 +5,124 @@ For new code, use the Orchestrator which provides better model routing and escal
 
 This agent remains for backward compatibility with existing code.
 """
+import re
 import warnings
-from typing import Optional
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Optional
 from models.lifecycle import ModelLifecycleManager, ModelRole
 
+# Patterns used by _extract_code
+_RE_CODE_BLOCK = re.compile(r'```(?:\w+)?\n(.*?)```', re.DOTALL)
+
+# Lead-ins stripped from responses without a code block (lowercase)
+_PREFIXES = ("here's", "here is", "the code", "code:", "output:")
+
+# File extension -> language name
+_LANG_MAP: Mapping[str, str] = MappingProxyType({
+    'py': 'python',
+    'js': 'javascript',
+    'ts': 'typescript',
+    'java': 'java',
+    'cpp': 'cpp',
+    'c': 'c',
+    'go': 'go',
+    'rs': 'rust',
+    'rb': 'ruby',
+    'php': 'php',
+    'sh': 'bash',
+    'html': 'html',
+    'css': 'css',
+    'md': 'markdown',
+    'json': 'json',
+    'yaml': 'yaml',
+    'yml': 'yaml'
+})
+_DEFAULT_LANG = 'code'
+
+
+@lru_cache(maxsize=64)
+def _infer_language(extension: str) -> str:
+    """Map a file extension to a language name"""
+    if not extension.islower():
+        extension = extension.lower()
+    return _LANG_MAP.get(extension, _DEFAULT_LANG)
+
+
+def _ext(filename):
+    """Return the text after the last dot, defaulting to 'py'"""
+    i = filename.rfind('.')
+    return filename[i + 1:] if i != -1 else 'py'
+
+
+# Prompt templates: {language} is fixed per language, the %s slots per call
+_CREATE_TEMPLATE = """You are Codey, an expert coding assistant. Create a new {language} file.
+
+Filename: %s
+Task: %s
+
+Requirements:
+- Write clean, well-structured {language} code
+- Include necessary imports
+- Add brief comments only where logic is complex
+- Follow best practices for {language}
+- Make the code functional and ready to run
+
+Generate ONLY the code, no explanations. Start directly with the code:
+
+```{language}
+"""
+
+_EDIT_TEMPLATE = """You are Codey, an expert coding assistant. Modify the existing {language} code.
+
+Filename: %s
+Current code:
+```{language}
+%s
+```
+
+Task: %s
+
+Requirements:
+- Preserve existing functionality unless instructed to change it
+- Maintain the same code style
+- Add or modify code as needed
+- Keep necessary imports
+- Ensure the code remains functional
+
+Generate the complete updated code, no explanations. Start directly with the code:
+
+```{language}
+"""
+
+
+def _make_prompt_builder(template: str, language: str) -> Callable[..., str]:
+    """Specialize a prompt template for one language
+
+    The template is split at its %s slots once; the returned builder only
+    concatenates the fixed pieces with the per-call values.
+    """
+    head, *pieces = template.format(language=language).split('%s')
+
+    def build(*values):
+        parts = [head]
+        for value, piece in zip(values, pieces):
+            parts.append(str(value))
+            parts.append(piece)
+        return ''.join(parts)
+
+    return build
+
+
+# Builders for every known language, extended lazily for others
+_KNOWN_LANGUAGES = set(_LANG_MAP.values()) | {_DEFAULT_LANG}
+_CREATE_BUILDERS: Dict[str, Callable[..., str]] = {
+    language: _make_prompt_builder(_CREATE_TEMPLATE, language) for language in _KNOWN_LANGUAGES
+}
+_EDIT_BUILDERS: Dict[str, Callable[..., str]] = {
+    language: _make_prompt_builder(_EDIT_TEMPLATE, language) for language in _KNOWN_LANGUAGES
+}
+
 
 class CodingAgent:
     """Agent specialized in code generation and manipulation
@@ -106,7 +220,7 @@ class CodingAgent:
                 # Fall through to legacy approach
 
         # Legacy approach
-        extension = filename.split('.')[-1] if '.' in filename else 'py'
+        extension = _ext(filename)
         language = self._infer_language(extension)
 
         if existing_code:
@@ -159,7 +273,7 @@ class CodingAgent:
         existing_dict = {filename: existing_code} if existing_code else None
 
         # Infer language
-        extension = filename.split('.')[-1] if '.' in filename else 'py'
+        extension = _ext(filename)
         language = self._infer_language(extension)
 
         # Build coding task
@@ -190,86 +304,46 @@ class CodingAgent:
 
     def _build_create_prompt(self, filename, language, instructions):
         """Build prompt for creating new code"""
-        prompt = f"""You are Codey, an expert coding assistant. Create a new {language} file.
-
-Filename: {filename}
-Task: {instructions}
-
-Requirements:
-- Write clean, well-structured {language} code
-- Include necessary imports
-- Add brief comments only where logic is complex
-- Follow best practices for {language}
-- Make the code functional and ready to run
-
-Generate ONLY the code, no explanations. Start directly with the code:
-
-```{language}
-"""
-        return prompt
+        build = _CREATE_BUILDERS.get(language)
+        if build is None:
+            build = _CREATE_BUILDERS[language] = _make_prompt_builder(_CREATE_TEMPLATE, language)
+        return build(filename, instructions)
 
     def _build_edit_prompt(self, filename, language, existing_code, instructions):
         """Build prompt for editing existing code"""
-        prompt = f"""You are Codey, an expert coding assistant. Modify the existing {language} code.
-
-Filename: {filename}
-Current code:
-```{language}
-{existing_code}
-```
-
-Task: {instructions}
-
-Requirements:
-- Preserve existing functionality unless instructed to change it
-- Maintain the same code style
-- Add or modify code as needed
-- Keep necessary imports
-- Ensure the code remains functional
-
-Generate the complete updated code, no explanations. Start directly with the code:
-
-```{language}
-"""
-        return prompt
+        build = _EDIT_BUILDERS.get(language)
+        if build is None:
+            build = _EDIT_BUILDERS[language] = _make_prompt_builder(_EDIT_TEMPLATE, language)
+        return build(filename, existing_code, instructions)
 
     def _extract_code(self, response):
         """Extract code from model response"""
-        # Remove markdown code blocks if present
-        import re
-
-        # Try to find code block
-        code_block = re.search(r'```(?:\w+)?\n(.*?)```', response, re.DOTALL)
-        if code_block:
-            return code_block.group(1).strip()
+        # Fast path: locate the fences with plain string search
+        start = response.find('```')
+        if start != -1:
+            newline = response.find('\n', start + 3)
+            if newline != -1:
+                tag = response[start + 3:newline]
+                end = response.find('```', newline + 1)
+                if end != -1 and (not tag or tag.replace('_', 'a').isalnum()):
+                    return response[newline + 1:end].strip()
+
+            # Unusual fence layout; let the regex decide
+            code_block = _RE_CODE_BLOCK.search(response)
+            if code_block:
+                return code_block.group(1).strip()
 
         # If no code block, return cleaned response
         # Remove common prefixes
-        cleaned = re.sub(r'^(Here\'s|Here is|The code|Code:|Output:)\s*', '', response, flags=re.IGNORECASE)
-        return cleaned.strip()
+        head = response[:10].lower()
+        for prefix in _PREFIXES:
+            if head.startswith(prefix):
+                return response[len(prefix):].strip()
+        return response.strip()
 
     def _infer_language(self, extension):
         """Infer programming language from file extension"""
-        language_map = {
-            'py': 'python',
-            'js': 'javascript',
-            'ts': 'typescript',
-            'java': 'java',
-            'cpp': 'cpp',
-            'c': 'c',
-            'go': 'go',
-            'rs': 'rust',
-            'rb': 'ruby',
-            'php': 'php',
-            'sh': 'bash',
-            'html': 'html',
-            'css': 'css',
-            'md': 'markdown',
-            'json': 'json',
-            'yaml': 'yaml',
-            'yml': 'yaml'
-        }
-        return language_map.get(extension.lower(), 'code')
+        return _infer_language(extension)
 
     def explain_code(self, filename):
         """Explain what code in a file does"""
@@ -283,7 +357,7 @@ Generate the complete updated code, no explanations. Start directly with the cod
             }
 
         code = read_result['content']
-        extension = filename.split('.')[-1] if '.' in filename else 'py'
+        extension = _ext(filename)
         language = self._infer_language(extension)
 
         prompt = f"""You are Codey, an expert coding assistant. Explain this {language} code clearly and concisely.
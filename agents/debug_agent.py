@@ -1,9 +1,29 @@
 """Advanced debugging agent with Perplexity integration"""
 import re
 import ast
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from typing import Dict, Any, Optional, List
 
+# Patterns used by static analysis and response cleanup
+_RE_TODO = re.compile(r'\b(?:TODO|FIXME)\b')
+_RE_ISSUES = re.compile(
+    r'(?P<todo>\bTODO\b|\bFIXME\b)'
+    r'|(?P<bare>except\s*:)'
+    r'|(?P<dprint>(?<!def )\bprint\s*\()'
+)
+_ISSUE_ORDER = {'todo': 0, 'bare_except': 1, 'debug_print': 2}
+_RE_CODE_BLOCK = re.compile(r'```(?:python)?\n(.*?)```', re.DOTALL)
+# Lead-ins stripped from responses without a code block (lowercase)
+_PREFIXES = ("here's", "here is", "fixed code:", "code:")
+_RE_ERROR_LINE = re.compile(r'\bline (\d+)')
+
+_TRUNCATED_MARKER = '# ... truncated ...'
+
+
 class DebugAgent:
     """Intelligent debugging system with local and online assistance"""
 
@@ -12,9 +32,17 @@ class DebugAgent:
         self.tools = file_tools
         self.perplexity = perplexity_api
 
-    def analyze_file(self, filename: str) -> Dict[str, Any]:
-        """Analyze a Python file for potential issues"""
-        read_result = self.tools.read_file(filename)
+        # filename -> {'stamp', 'read', 'syntax'}; reused while the file's
+        # mtime and size are unchanged so one debug run reads and parses once
+        self._file_cache = {}
+
+    def analyze_file(self, filename: str, full: bool = False) -> Dict[str, Any]:
+        """Analyze a Python file for potential issues
+
+        A file with a syntax error reports only that error unless ``full``
+        is set, in which case the fallback line scan runs as well.
+        """
+        read_result, entry = self._cached_read(filename)
 
         if not read_result['success']:
             return {
@@ -24,10 +52,63 @@ class DebugAgent:
             }
 
         code = read_result['content']
-        issues = []
 
         # Basic syntax check
-        syntax_check = self._check_syntax(code, filename)
+        syntax_check = entry['syntax'] if entry else None
+        if syntax_check is None:
+            syntax_check = self._check_syntax(code, filename)
+            if entry:
+                entry['syntax'] = syntax_check
+
+        return self._analysis_result(filename, self._collect_issues(code, syntax_check, full))
+
+    def analyze_files(self, filenames: List[str], max_workers: Optional[int] = None,
+                      full: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Analyze several Python files, parsing them in parallel
+
+        Parsing is CPU bound and holds the GIL, so the work is spread over
+        a process pool. Platforms without working multiprocessing (e.g.
+        Termux) fall back to analyzing the files one by one.
+
+        Returns:
+            Dict mapping each filename to its analyze_file-style result
+        """
+        results = {}
+        sources = {}
+        for filename in filenames:
+            read_result, _ = self._cached_read(filename)
+            if read_result['success']:
+                sources[filename] = read_result['content']
+            else:
+                results[filename] = {
+                    'success': False,
+                    'error': read_result['error'],
+                    'issues': []
+                }
+
+        if len(sources) > 1:
+            workers = min(max_workers or os.cpu_count() or 1, len(sources))
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    chunksize = max(1, len(sources) // (workers * 4))
+                    analyzed = pool.map(partial(_analyze_one, full=full), sources.values(),
+                                        chunksize=chunksize)
+                    for filename, issues in zip(sources, analyzed):
+                        results[filename] = self._analysis_result(filename, issues)
+            except (ImportError, OSError, NotImplementedError, BrokenProcessPool):
+                # Whatever the pool did not finish is analyzed inline below
+                pass
+
+        for filename in sources:
+            if filename not in results:
+                results[filename] = self.analyze_file(filename, full)
+
+        return {filename: results[filename] for filename in filenames}
+
+    def _collect_issues(self, code: str, syntax_check: Dict[str, Any],
+                        full: bool = False) -> List[Dict[str, Any]]:
+        """Combine the syntax check and static analysis into one issue list"""
+        issues = []
         if not syntax_check['valid']:
             issues.append({
                 'type': 'syntax_error',
@@ -35,11 +116,19 @@ class DebugAgent:
                 'message': syntax_check['error'],
                 'line': syntax_check.get('line')
             })
+            # The syntax error is the actionable issue; skip the scan
+            if full:
+                issues.extend(self._scan_lines(code))
+            return issues
 
-        # Static analysis
-        static_issues = self._static_analysis(code)
+        # Static analysis (reuses the tree parsed by the syntax check)
+        static_issues = self._static_analysis(code, syntax_check.get('tree'))
         issues.extend(static_issues)
+        return issues
 
+    @staticmethod
+    def _analysis_result(filename: str, issues: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Build the result dict returned by analyze_file"""
         return {
             'success': True,
             'file': filename,
@@ -47,11 +136,34 @@ class DebugAgent:
             'issue_count': len(issues)
         }
 
+    def _cached_read(self, filename: str):
+        """Read a file, reusing the cached result while it is unchanged on disk
+
+        Returns the read result and its cache entry. The entry is None
+        when the file could not be stat'ed or read; nothing is cached then.
+        """
+        stat = self.tools.file_stat(filename)
+        if not stat['success']:
+            self._file_cache.pop(filename, None)
+            return self.tools.read_file(filename), None
+
+        stamp = (stat['mtime_ns'], stat['size'])
+        entry = self._file_cache.get(filename)
+        if entry is None or entry['stamp'] != stamp:
+            read_result = self.tools.read_file(filename)
+            if not read_result['success']:
+                self._file_cache.pop(filename, None)
+                return read_result, None
+            entry = {'stamp': stamp, 'read': read_result, 'syntax': None}
+            self._file_cache[filename] = entry
+
+        return entry['read'], entry
+
     def _check_syntax(self, code: str, filename: str) -> Dict[str, Any]:
         """Check Python syntax"""
         try:
-            ast.parse(code)
-            return {'valid': True}
+            tree = ast.parse(code)
+            return {'valid': True, 'tree': tree}
         except SyntaxError as e:
             return {
                 'valid': False,
@@ -60,52 +172,115 @@ class DebugAgent:
                 'offset': e.offset
             }
 
-    def _static_analysis(self, code: str) -> List[Dict[str, Any]]:
-        """Perform static analysis for common issues"""
-        issues = []
-
-        # Check for common issues
-        lines = code.split('\n')
+    def _static_analysis(self, code: str, tree: Optional[ast.AST] = None) -> List[Dict[str, Any]]:
+        """Perform static analysis for common issues
 
-        for i, line in enumerate(lines, 1):
-            # Unused imports (basic check)
-            if 'import' in line and line.strip().startswith('import'):
-                # This is a simplified check
-                pass
+        Bare excepts and debug prints are found by walking the AST, so
+        matches inside strings and comments are ignored. Code that does
+        not parse falls back to a per-line regex scan.
+        """
+        if tree is None:
+            try:
+                tree = ast.parse(code)
+            except SyntaxError:
+                return self._scan_lines(code)
 
-            # TODO/FIXME comments
-            if 'TODO' in line or 'FIXME' in line:
-                issues.append({
-                    'type': 'todo',
-                    'severity': 'low',
-                    'message': f"TODO/FIXME comment: {line.strip()}",
-                    'line': i
-                })
+        issues = []
 
+        # TODO/FIXME comments
+        for m in _RE_TODO.finditer(code):
+            line_start = code.rfind('\n', 0, m.start()) + 1
+            line_end = code.find('\n', m.end())
+            if line_end == -1:
+                line_end = len(code)
+            issues.append(self._todo_issue(
+                code[line_start:line_end], code.count('\n', 0, m.start()) + 1
+            ))
+
+        for node in ast.walk(tree):
             # Bare except
-            if re.search(r'except\s*:', line):
-                issues.append({
-                    'type': 'bare_except',
-                    'severity': 'medium',
-                    'message': "Bare except clause - should specify exception type",
-                    'line': i
-                })
+            if isinstance(node, ast.ExceptHandler) and node.type is None:
+                issues.append(self._bare_except_issue(node.lineno))
 
             # Print statements (potential debug code)
-            if re.search(r'\bprint\s*\(', line) and 'def ' not in line:
-                issues.append({
-                    'type': 'debug_print',
-                    'severity': 'low',
-                    'message': "Debug print statement found",
-                    'line': i
-                })
+            elif (isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                    and node.func.id == 'print'):
+                issues.append(self._debug_print_issue(node.lineno))
+
+        # A line may hold several matches; report each kind once, in line order
+        seen = set()
+        unique = []
+        for issue in sorted(issues, key=lambda i: (i['line'], _ISSUE_ORDER[i['type']])):
+            key = (issue['line'], issue['type'])
+            if key not in seen:
+                seen.add(key)
+                unique.append(issue)
+        return unique
+
+    def _scan_lines(self, code: str) -> List[Dict[str, Any]]:
+        """Regex scan used when the code cannot be parsed"""
+        issues = []
+
+        # One regex pass per line; a line may report several kinds of issue.
+        # Lines are sliced off one at a time rather than split into a list.
+        i = 0
+        start = 0
+        length = len(code)
+        while start < length:
+            end = code.find('\n', start)
+            if end == -1:
+                end = length
+            i += 1
+            line = code[start:end]
+            start = end + 1
+
+            kinds = {m.lastgroup for m in _RE_ISSUES.finditer(line)}
+            if not kinds:
+                continue
+
+            if 'todo' in kinds:
+                issues.append(self._todo_issue(line, i))
+            if 'bare' in kinds:
+                issues.append(self._bare_except_issue(i))
+            if 'dprint' in kinds:
+                issues.append(self._debug_print_issue(i))
 
         return issues
 
+    @staticmethod
+    def _todo_issue(line: str, lineno: int) -> Dict[str, Any]:
+        """Build a TODO/FIXME issue"""
+        return {
+            'type': 'todo',
+            'severity': 'low',
+            'message': f"TODO/FIXME comment: {line.strip()}",
+            'line': lineno
+        }
+
+    @staticmethod
+    def _bare_except_issue(lineno: int) -> Dict[str, Any]:
+        """Build a bare-except issue"""
+        return {
+            'type': 'bare_except',
+            'severity': 'medium',
+            'message': "Bare except clause - should specify exception type",
+            'line': lineno
+        }
+
+    @staticmethod
+    def _debug_print_issue(lineno: int) -> Dict[str, Any]:
+        """Build a debug-print issue"""
+        return {
+            'type': 'debug_print',
+            'severity': 'low',
+            'message': "Debug print statement found",
+            'line': lineno
+        }
+
     def debug_error(self, filename: str, error_message: Optional[str] = None) -> Dict[str, Any]:
         """Debug an error in a file"""
         # Read the file
-        read_result = self.tools.read_file(filename)
+        read_result, _ = self._cached_read(filename)
 
         if not read_result['success']:
             return {
@@ -118,11 +293,14 @@ class DebugAgent:
         # Try local debugging first
         analysis = self.analyze_file(filename)
 
-        # If we have Perplexity and an error message, get deeper insights
+        # If we have Perplexity and an error message, get deeper insights.
+        # Large files are cut down to the regions around known problems.
         perplexity_help = None
         if self.perplexity and error_message:
+            focus_lines = [issue.get('line') for issue in analysis.get('issues', [])]
+            focus_lines.extend(int(n) for n in _RE_ERROR_LINE.findall(error_message))
             perplexity_help = self.perplexity.debug_with_perplexity(
-                code,
+                _compact_code(code, focus_lines),
                 error_message,
                 language='python'
             )
@@ -143,8 +321,8 @@ class DebugAgent:
         if not debug_result['success']:
             return debug_result
 
-        # Read current code
-        read_result = self.tools.read_file(filename)
+        # Read current code (cached by debug_error unless it changed since)
+        read_result, _ = self._cached_read(filename)
         current_code = read_result['content']
 
         # Build fix prompt
@@ -165,6 +343,7 @@ class DebugAgent:
 
             # Write fixed code
             write_result = self.tools.write_file(filename, fixed_code, overwrite=True)
+            self._file_cache.pop(filename, None)
 
             if write_result['success']:
                 return {
@@ -226,51 +405,122 @@ Provide ONLY the fixed code:
 
     def _extract_code(self, response: str) -> str:
         """Extract code from response"""
-        # Remove markdown code blocks
-        code_block = re.search(r'```(?:python)?\n(.*?)```', response, re.DOTALL)
-        if code_block:
-            return code_block.group(1).strip()
+        # Fast path: locate the fences with plain string search
+        start = response.find('```')
+        if start != -1:
+            newline = response.find('\n', start + 3)
+            if newline != -1 and response[start + 3:newline] in ('', 'python'):
+                end = response.find('```', newline + 1)
+                if end != -1:
+                    return response[newline + 1:end].strip()
+
+            # Unusual fence layout; let the regex decide
+            code_block = _RE_CODE_BLOCK.search(response)
+            if code_block:
+                return code_block.group(1).strip()
 
         # Clean response
-        cleaned = re.sub(r'^(Here\'s|Here is|Fixed code:|Code:)\s*', '', response, flags=re.IGNORECASE)
-        return cleaned.strip()
+        head = response[:11].lower()
+        for prefix in _PREFIXES:
+            if head.startswith(prefix):
+                return response[len(prefix):].strip()
+        return response.strip()
 
     def suggest_improvements(self, filename: str) -> Dict[str, Any]:
         """Suggest code improvements"""
-        read_result = self.tools.read_file(filename)
+        return self.suggest_improvements_for_files([filename])[0]
 
-        if not read_result['success']:
-            return {
-                'success': False,
-                'error': read_result['error']
-            }
+    def suggest_improvements_for_files(self, filenames: List[str]) -> List[Dict[str, Any]]:
+        """Suggest improvements for several files
 
-        code = read_result['content']
+        Perplexity lookups for all readable files are coalesced through
+        ``PerplexityAPI.get_best_practices_batch`` instead of one request
+        per file.
+        """
+        reads = {filename: self._cached_read(filename)[0] for filename in filenames}
 
         # Get suggestions from Perplexity if available
-        suggestions = []
+        best_practices = {}
+        readable = [f for f in filenames if reads[f]['success']]
+        if self.perplexity and readable:
+            answers = self.perplexity.get_best_practices_batch([
+                f"reviewing and improving this code:\n{reads[f]['content'][:500]}"  # First 500 chars
+                for f in readable
+            ], language="python")
+            best_practices = dict(zip(readable, answers))
+
+        results = []
+        for filename in filenames:
+            if not reads[filename]['success']:
+                results.append({
+                    'success': False,
+                    'error': reads[filename]['error']
+                })
+                continue
 
-        if self.perplexity:
-            best_practices = self.perplexity.get_best_practices(
-                f"reviewing and improving this code:\n{code[:500]}",  # First 500 chars
-                language="python"
-            )
-            if best_practices:
+            suggestions = []
+            if best_practices.get(filename):
                 suggestions.append({
                     'source': 'perplexity',
-                    'suggestion': best_practices
+                    'suggestion': best_practices[filename]
                 })
 
-        # Local analysis
-        analysis = self.analyze_file(filename)
-        if analysis['success'] and analysis['issues']:
-            suggestions.append({
-                'source': 'local',
-                'issues': analysis['issues']
+            # Local analysis
+            analysis = self.analyze_file(filename)
+            if analysis['success'] and analysis['issues']:
+                suggestions.append({
+                    'source': 'local',
+                    'issues': analysis['issues']
+                })
+
+            results.append({
+                'success': True,
+                'file': filename,
+                'suggestions': suggestions
             })
 
-        return {
-            'success': True,
-            'file': filename,
-            'suggestions': suggestions
-        }
+        return results
+
+
+def _compact_code(code: str, focus_lines: Optional[List[int]] = None,
+                  max_chars: int = 6000, context: int = 20) -> str:
+    """Shrink large source deterministically before sending it over the network
+
+    Code within ``max_chars`` is returned unchanged. Otherwise the result
+    keeps ``context`` lines around each focus line, or the head and tail
+    of the file when there are no usable focus lines.
+    """
+    if len(code) <= max_chars:
+        return code
+
+    lines = code.split('\n')
+    windows = []
+    for line in sorted({n for n in (focus_lines or []) if isinstance(n, int) and 0 < n <= len(lines)}):
+        start, end = max(0, line - 1 - context), min(len(lines), line + context)
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+
+    if windows:
+        parts = []
+        if windows[0][0] > 0:
+            parts.append(_TRUNCATED_MARKER)
+        for i, (start, end) in enumerate(windows):
+            if i:
+                parts.append(_TRUNCATED_MARKER)
+            parts.extend(lines[start:end])
+        if windows[-1][1] < len(lines):
+            parts.append(_TRUNCATED_MARKER)
+        compacted = '\n'.join(parts)
+        if len(compacted) <= max_chars:
+            return compacted
+
+    half = (max_chars - len(_TRUNCATED_MARKER) - 2) // 2
+    return f"{code[:half]}\n{_TRUNCATED_MARKER}\n{code[-half:]}"
+
+
+def _analyze_one(code: str, full: bool = False) -> List[Dict[str, Any]]:
+    """Analyze one source string; module-level so pool workers can import it"""
+    agent = DebugAgent(None, None)
+    return agent._collect_issues(code, agent._check_syntax(code, '<analyze_files>'), full)
@@ -1,14 +1,68 @@
 """Perplexity API integration with retry logic and fallback (v2.1)"""
+import io
+import os
 import json
-import urllib.request
+import atexit
+import hashlib
+import http.client
+import random
+import threading
 import urllib.error
+import urllib.parse
 import time
-from typing import Optional, Dict, Any
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable, Iterator, List
 from pathlib import Path
 
+# Optional: orjson encodes/decodes request payloads in C, straight to bytes
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def _loads(data: bytes):
+        return json.loads(data)
+
+
+# HTTP statuses that indicate a transient server-side failure
+_RETRYABLE_STATUS = frozenset({500, 502, 503, 504})
+
+# Temp files older than this are left over from a crashed cache write
+_STALE_TMP_SECONDS = 3600
+
+# Longest wait between retries, whatever the backoff or Retry-After says
+_MAX_RETRY_DELAY = 60.0
+
+# Failures that can cut a streamed response off part way through
+_STREAM_ERRORS = (OSError, http.client.HTTPException, ValueError, KeyError, IndexError)
+
+
+class _ThreadConnections:
+    """Per-thread holder for the keep-alive pool (see _thread_connections)"""
+    __slots__ = ('conns', '__weakref__')
+
+    def __init__(self):
+        self.conns = {}
+
+
 class PerplexityAPI:
     """Interface to Perplexity API with enhanced robustness"""
 
+    # Keep-alive HTTPS connections shared by every instance: one per
+    # thread and host, so agents holding separate instances still reuse
+    # the same sockets and skip repeated TCP/TLS handshakes
+    _pool = threading.local()
+    _open_connections = set()
+    _pool_lock = threading.Lock()
+
     def __init__(self, api_key: str, config=None):
         self.api_key = api_key
         self.api_url = "https://api.perplexity.ai/chat/completions"
@@ -18,12 +72,41 @@ class PerplexityAPI:
         self.retry_limit = 3
         self.timeout_seconds = 30
         self.fallback_to_local = True
+        self.max_concurrent_requests = 4
+        self.cache_size = 128
+        self.disk_cache = True
+        self.cache_ttl_seconds = 86400
+        self.disk_cache_max_files = 512
 
         if config and hasattr(config, 'perplexity'):
             perplexity_config = config.perplexity
             self.retry_limit = perplexity_config.get('retry_limit', 3)
             self.timeout_seconds = perplexity_config.get('timeout_seconds', 30)
             self.fallback_to_local = perplexity_config.get('fallback_to_local', True)
+            self.max_concurrent_requests = perplexity_config.get('max_concurrent_requests', 4)
+            self.cache_size = perplexity_config.get('cache_size', 128)
+            self.disk_cache = perplexity_config.get('disk_cache', True)
+            self.cache_ttl_seconds = perplexity_config.get('cache_ttl_seconds', 86400)
+            self.disk_cache_max_files = perplexity_config.get('disk_cache_max_files', 512)
+
+        # LRU cache of responses for idempotent prompts, keyed by request hash,
+        # backed by one file per response so answers survive restarts
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_dir = None
+        self._disk_entries = 0
+        if config and hasattr(config, 'log_dir') and self.disk_cache:
+            self.cache_dir = Path(config.log_dir).parent / "perplexity_cache"
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._prune_disk_cache()
+
+        # Headers are identical for every call
+        self._headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive"
+        }
+        self._stream_headers = {**self._headers, "Accept": "text/event-stream"}
 
         # Initialize error logger
         self.error_log = None
@@ -45,20 +128,239 @@ class PerplexityAPI:
                 'request': request_data
             }
 
-            with open(self.error_log, 'a') as f:
-                f.write(json.dumps(log_entry) + '\n')
+            with open(self.error_log, 'ab') as f:
+                f.write(_dumps(log_entry) + b'\n')
         except Exception:
             # Don't fail if logging fails
             pass
 
-    def _make_request(self, messages: list, max_tokens: int = 1024, retry_count: int = 0) -> Optional[str]:
-        """Make a request to Perplexity API with retry logic"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
+    def _cache_key(self, data: dict) -> str:
+        """Hash a request payload into a cache key"""
+        payload = json.dumps(data, sort_keys=True).encode('utf-8')
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached response, marking it as recently used"""
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        content = self._disk_cache_get(key)
+        if content is not None:
+            self._remember(key, content)
+        return content
+
+    def _cache_put(self, key: str, content: str):
+        """Store a response in memory and on disk"""
+        self._remember(key, content)
+        self._disk_cache_put(key, content)
+
+    def _remember(self, key: str, content: str):
+        """Add to the in-memory LRU, evicting the oldest entry if full"""
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = content
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _disk_cache_get(self, key: str) -> Optional[str]:
+        """Read an unexpired response from the disk cache"""
+        if not self.cache_dir:
+            return None
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, 'rb') as f:
+                entry = _loads(f.read())
+            if entry['expires'] > time.time():
+                return entry['content']
+            path.unlink()
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _disk_cache_put(self, key: str, content: str):
+        """Write a response to the disk cache atomically"""
+        if not self.cache_dir:
+            return
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_dumps({'expires': time.time() + self.cache_ttl_seconds, 'content': content}))
+            os.replace(tmp_path, path)
+        except OSError:
+            # A cache write failure only costs a future network call
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return
+
+        with self._cache_lock:
+            self._disk_entries += 1
+            full = self._disk_entries > self.disk_cache_max_files
+        if full:
+            self._prune_disk_cache()
 
-        data = {
+    def _prune_disk_cache(self):
+        """Delete expired entries and keep at most disk_cache_max_files
+
+        An entry is written once, so its mtime plus the TTL is its expiry.
+        The oldest entries go first when over the limit. Leftover temp
+        files from interrupted writes are removed as well.
+        """
+        try:
+            paths = list(self.cache_dir.iterdir())
+        except OSError:
+            return
+
+        now = time.time()
+        entries = []
+        for path in paths:
+            try:
+                mtime = path.stat().st_mtime
+                if path.suffix == '.tmp':
+                    if now - mtime > _STALE_TMP_SECONDS:
+                        path.unlink()
+                elif path.suffix == '.json':
+                    if mtime + self.cache_ttl_seconds <= now:
+                        path.unlink()
+                    else:
+                        entries.append((mtime, path))
+            except OSError:
+                # Removed concurrently by another instance
+                continue
+
+        excess = len(entries) - max(0, self.disk_cache_max_files)
+        if excess > 0:
+            entries.sort()
+            for _, path in entries[:excess]:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            entries = entries[excess:]
+
+        with self._cache_lock:
+            self._disk_entries = len(entries)
+
+    def clear_cache(self):
+        """Drop all cached responses, including those on disk"""
+        with self._cache_lock:
+            self._cache.clear()
+        if self.cache_dir:
+            for path in self.cache_dir.glob('*.json'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            with self._cache_lock:
+                self._disk_entries = 0
+
+    @classmethod
+    def _thread_connections(cls) -> Dict[str, http.client.HTTPSConnection]:
+        """Return the calling thread's host -> connection map
+
+        The map hangs off a thread-local holder. When the thread exits
+        the holder is dropped and its connections are closed, so pool
+        threads do not leave sockets open until ``close_all`` runs.
+        """
+        holder = getattr(cls._pool, 'holder', None)
+        if holder is None:
+            holder = cls._pool.holder = _ThreadConnections()
+            weakref.finalize(holder, cls._discard_connections, holder.conns)
+        return holder.conns
+
+    @classmethod
+    def _discard_connections(cls, conns: Dict[str, http.client.HTTPSConnection]):
+        """Close and forget every connection in a thread's map"""
+        for conn in list(conns.values()):
+            conn.close()
+            with cls._pool_lock:
+                cls._open_connections.discard(conn)
+        conns.clear()
+
+    def _get_connection(self) -> http.client.HTTPSConnection:
+        """Return this thread's keep-alive connection, opening it if needed"""
+        host = urllib.parse.urlsplit(self.api_url).netloc
+        conns = self._thread_connections()
+        conn = conns.get(host)
+        if conn is None:
+            conn = http.client.HTTPSConnection(host, timeout=self.timeout_seconds)
+            conns[host] = conn
+            with self._pool_lock:
+                self._open_connections.add(conn)
+        return conn
+
+    def _has_connection(self) -> bool:
+        """Whether this thread already holds a connection to the API host"""
+        return urllib.parse.urlsplit(self.api_url).netloc in self._thread_connections()
+
+    def _close_connection(self):
+        """Close this thread's connection so the next request reconnects"""
+        conn = self._thread_connections().pop(urllib.parse.urlsplit(self.api_url).netloc, None)
+        if conn is not None:
+            conn.close()
+            with self._pool_lock:
+                self._open_connections.discard(conn)
+
+    def close(self):
+        """Close the calling thread's keep-alive connection"""
+        self._close_connection()
+
+    @classmethod
+    def close_all(cls):
+        """Close every pooled connection, from all threads
+
+        Registered with ``atexit`` so sockets are shut down cleanly
+        instead of lingering until the process is torn down.
+        """
+        with cls._pool_lock:
+            conns = list(cls._open_connections)
+            cls._open_connections.clear()
+        for conn in conns:
+            conn.close()
+
+    def _post(self, body: bytes, headers: dict) -> bytes:
+        """POST a request body over the keep-alive connection
+
+        Raises the same ``urllib.error`` exceptions as ``urlopen`` so the
+        retry handling in ``_make_request`` applies unchanged.
+        """
+        path = urllib.parse.urlsplit(self.api_url).path or '/'
+        reused = self._has_connection()
+
+        while True:
+            conn = self._get_connection()
+            try:
+                conn.request('POST', path, body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+                break
+            except (OSError, http.client.HTTPException) as e:
+                self._close_connection()
+                # The server may have dropped an idle connection; retry once fresh
+                if reused:
+                    reused = False
+                    continue
+                raise urllib.error.URLError(e)
+
+        if response.will_close:
+            self._close_connection()
+
+        if response.status >= 400:
+            raise urllib.error.HTTPError(
+                self.api_url, response.status, response.reason,
+                response.headers, io.BytesIO(payload)
+            )
+        return payload
+
+    def _payload(self, messages: list, max_tokens: int = 1024) -> dict:
+        """Build the chat completion request body"""
+        return {
             "model": self.model,
             "messages": messages,
             "max_tokens": max_tokens,
@@ -66,55 +368,165 @@ class PerplexityAPI:
             "top_p": 0.9
         }
 
-        try:
-            req = urllib.request.Request(
-                self.api_url,
-                data=json.dumps(data).encode('utf-8'),
-                headers=headers,
-                method='POST'
-            )
-
-            with urllib.request.urlopen(req, timeout=self.timeout_seconds) as response:
-                result = json.loads(response.read().decode('utf-8'))
-                return result['choices'][0]['message']['content']
-
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode('utf-8') if hasattr(e, 'read') else str(e)
-
-            # Handle rate limiting (HTTP 429)
-            if e.code == 429:
-                if retry_count < self.retry_limit:
-                    wait_time = 2 ** retry_count  # Exponential backoff: 1s, 2s, 4s
-                    print(f"⚠️  Perplexity rate limit hit. Retrying in {wait_time}s... (attempt {retry_count + 1}/{self.retry_limit})")
-                    time.sleep(wait_time)
-                    return self._make_request(messages, max_tokens, retry_count + 1)
-                else:
+    def _make_request(self, messages: list, max_tokens: int = 1024, cache: bool = False) -> Optional[str]:
+        """Make a request to Perplexity API with retry logic
+
+        When ``cache`` is True, identical requests are answered from the
+        in-memory LRU or the on-disk cache instead of the network.
+        """
+        data = self._payload(messages, max_tokens)
+
+        cache_key = None
+        if cache:
+            cache_key = self._cache_key(data)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        # Encode once; every retry sends the same bytes
+        body = _dumps(data)
+
+        for retry_count in range(self.retry_limit + 1):
+            can_retry = retry_count < self.retry_limit
+            try:
+                result = _loads(self._post(body, self._headers))
+                content = result['choices'][0]['message']['content']
+                if cache_key:
+                    self._cache_put(cache_key, content)
+                return content
+
+            except urllib.error.HTTPError as e:
+                error_body = e.read().decode('utf-8') if hasattr(e, 'read') else str(e)
+                retry_after = e.headers.get('Retry-After') if e.headers else None
+
+                # Handle rate limiting (HTTP 429)
+                if e.code == 429:
+                    if can_retry:
+                        wait_time = self._retry_delay(retry_count, retry_after)
+                        print(f"⚠️  Perplexity rate limit hit. Retrying in {wait_time:.1f}s... (attempt {retry_count + 1}/{self.retry_limit})")
+                        time.sleep(wait_time)
+                        continue
                     self._log_error('RATE_LIMIT', f'Exceeded retry limit after {self.retry_limit} attempts', data)
                     print(f"❌ Perplexity rate limit exceeded. {self._fallback_message()}")
                     return None
 
-            # Handle other HTTP errors
-            self._log_error('HTTP_ERROR', f'HTTP {e.code}: {error_body}', data)
-            print(f"❌ Perplexity API error (HTTP {e.code}). {self._fallback_message()}")
-            return None
+                # Transient server errors are worth retrying too
+                if e.code in _RETRYABLE_STATUS and can_retry:
+                    wait_time = self._retry_delay(retry_count, retry_after)
+                    print(f"⚠️  Perplexity server error (HTTP {e.code}). Retrying in {wait_time:.1f}s... (attempt {retry_count + 1}/{self.retry_limit})")
+                    time.sleep(wait_time)
+                    continue
 
-        except urllib.error.URLError as e:
-            # Network errors (timeout, connection failed, etc.)
-            if retry_count < self.retry_limit:
-                wait_time = 2 ** retry_count
-                print(f"⚠️  Network error connecting to Perplexity. Retrying in {wait_time}s... (attempt {retry_count + 1}/{self.retry_limit})")
-                time.sleep(wait_time)
-                return self._make_request(messages, max_tokens, retry_count + 1)
-            else:
+                # Handle other HTTP errors
+                self._log_error('HTTP_ERROR', f'HTTP {e.code}: {error_body}', data)
+                print(f"❌ Perplexity API error (HTTP {e.code}). {self._fallback_message()}")
+                return None
+
+            except urllib.error.URLError as e:
+                # Network errors (timeout, connection failed, etc.)
+                if can_retry:
+                    wait_time = self._retry_delay(retry_count)
+                    print(f"⚠️  Network error connecting to Perplexity. Retrying in {wait_time:.1f}s... (attempt {retry_count + 1}/{self.retry_limit})")
+                    time.sleep(wait_time)
+                    continue
                 self._log_error('NETWORK_ERROR', str(e.reason), data)
                 print(f"❌ Perplexity network error. {self._fallback_message()}")
                 return None
 
-        except Exception as e:
-            # Unexpected errors
-            self._log_error('UNEXPECTED_ERROR', str(e), data)
-            print(f"❌ Perplexity unexpected error: {str(e)[:100]}. {self._fallback_message()}")
-            return None
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                # Malformed response body; anything else is a bug and propagates
+                self._log_error('UNEXPECTED_ERROR', str(e), data)
+                print(f"❌ Perplexity unexpected error: {str(e)[:100]}. {self._fallback_message()}")
+                return None
+
+        return None
+
+    def _retry_delay(self, retry_count: int, retry_after: Optional[str] = None) -> float:
+        """Seconds to wait before retry number ``retry_count + 1``
+
+        A numeric Retry-After header from the server wins; otherwise use
+        exponential backoff (1s, 2s, 4s...) plus up to the same amount of
+        random jitter, so concurrent callers spread their retries out
+        instead of hitting the API together. Either way the wait is
+        capped at ``_MAX_RETRY_DELAY`` seconds.
+        """
+        if retry_after:
+            try:
+                return min(_MAX_RETRY_DELAY, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        base = 2 ** retry_count
+        return min(_MAX_RETRY_DELAY, base + random.uniform(0, base))
+
+    def batch(self, calls: List[Callable[[], Any]]) -> List[Any]:
+        """Run several independent API calls concurrently
+
+        Each call is a zero-argument callable, e.g.
+        ``lambda: api.get_best_practices(task)``. Requests are network
+        bound, so they are issued from a small thread pool capped at
+        ``max_concurrent_requests`` to stay under the rate limit.
+
+        Returns:
+            Results in the same order as ``calls``
+        """
+        if len(calls) <= 1:
+            return [call() for call in calls]
+
+        # Each worker keeps one connection for all the calls it runs; the
+        # pool joins its threads on exit, which closes those connections
+        workers = max(1, min(self.max_concurrent_requests, len(calls)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(lambda call: call(), calls))
+
+    def _stream_request(self, messages: list, max_tokens: int = 1024) -> Iterator[str]:
+        """Stream a completion, yielding content deltas as they arrive
+
+        Sends ``"stream": true`` and parses the server-sent event frames
+        line by line. An HTTP error status is logged and ends the stream
+        without yielding anything. A failure part way through is logged
+        and re-raised (one of ``_STREAM_ERRORS``), so callers can tell a
+        cut-off answer from a complete one.
+        """
+        data = self._payload(messages, max_tokens)
+        data["stream"] = True
+
+        path = urllib.parse.urlsplit(self.api_url).path or '/'
+        finished = False
+        try:
+            conn = self._get_connection()
+            conn.request('POST', path, body=_dumps(data), headers=self._stream_headers)
+            response = conn.getresponse()
+
+            if response.status >= 400:
+                error_body = response.read().decode('utf-8', errors='replace')
+                finished = not response.will_close
+                self._log_error('HTTP_ERROR', f'HTTP {response.status}: {error_body}', data)
+                return
+
+            for raw in iter(response.readline, b''):
+                line = raw.strip()
+                if not line.startswith(b'data:'):
+                    continue
+                payload = line[5:].strip()
+                if payload == b'[DONE]':
+                    break
+                chunk = _loads(payload)
+                delta = chunk['choices'][0].get('delta', {}).get('content')
+                if delta:
+                    yield delta
+
+            # Drain the rest of the body so the connection can be reused
+            response.read()
+            finished = not response.will_close
+
+        except _STREAM_ERRORS as e:
+            self._log_error('STREAM_ERROR', str(e), data)
+            raise
+
+        finally:
+            # Abandoned or failed streams leave unread data on the socket
+            if not finished:
+                self._close_connection()
 
     def _fallback_message(self) -> str:
         """Get fallback message"""
@@ -123,9 +535,9 @@ class PerplexityAPI:
         else:
             return "Perplexity unavailable."
 
-    def ask_perplexity(self, question: str) -> Optional[str]:
-        """Ask Perplexity a general question"""
-        messages = [
+    def _question_messages(self, question: str) -> list:
+        """Build the message list for a general question"""
+        return [
             {
                 "role": "system",
                 "content": "You are a helpful coding assistant. Provide clear, concise, and accurate answers."
@@ -136,7 +548,38 @@ class PerplexityAPI:
             }
         ]
 
-        return self._make_request(messages)
+    def ask_perplexity(self, question: str) -> Optional[str]:
+        """Ask Perplexity a general question"""
+        return self._make_request(self._question_messages(question), cache=True)
+
+    def ask_perplexity_stream(self, question: str) -> Iterator[str]:
+        """Ask Perplexity a general question, yielding the answer as it arrives
+
+        A cached answer is yielded in one piece. If streaming produces
+        nothing, the regular request path (with retries) is used instead.
+        Streamed answers are not cached since a stream that ends early
+        cannot be told apart from a complete one.
+        """
+        messages = self._question_messages(question)
+        cached = self._cache_get(self._cache_key(self._payload(messages)))
+        if cached is not None:
+            yield cached
+            return
+
+        received = False
+        try:
+            for delta in self._stream_request(messages):
+                received = True
+                yield delta
+        except _STREAM_ERRORS:
+            # Text already shown cannot be taken back; a stream that failed
+            # before yielding anything falls back below
+            pass
+
+        if not received:
+            response = self._make_request(messages, cache=True)
+            if response:
+                yield response
 
     def get_code_from_perplexity(self, description: str, language: str = "python") -> Optional[str]:
         """Request code generation from Perplexity"""
@@ -151,6 +594,32 @@ class PerplexityAPI:
             }
         ]
 
+        # Stream the answer and stop reading once the code block closes;
+        # anything after it is explanation we would discard anyway
+        text = ''
+        pos = 0
+        fences = 0
+        try:
+            for delta in self._stream_request(messages, max_tokens=2048):
+                text += delta
+                while fences < 2:
+                    found = text.find('```', pos)
+                    if found == -1:
+                        # Keep the last two characters in case a fence straddles chunks
+                        pos = max(pos, len(text) - 2)
+                        break
+                    fences += 1
+                    pos = found + 3
+                if fences >= 2:
+                    break
+        except _STREAM_ERRORS:
+            # The stream was cut off mid-answer; never return a partial
+            # file, retry with a full request instead
+            text = ''
+
+        if text:
+            return text
+
         return self._make_request(messages, max_tokens=2048)
 
     def debug_with_perplexity(self, code_snippet: str, error_message: str = None, language: str = "python") -> Optional[Dict[str, Any]]:
@@ -173,7 +642,7 @@ class PerplexityAPI:
             }
         ]
 
-        response = self._make_request(messages, max_tokens=1536)
+        response = self._make_request(messages, max_tokens=1536, cache=True)
 
         if response:
             return {
@@ -207,7 +676,7 @@ class PerplexityAPI:
             }
         ]
 
-        return self._make_request(messages)
+        return self._make_request(messages, cache=True)
 
     def explain_error(self, error_message: str, code_context: str = None) -> Optional[str]:
         """Explain an error message in detail"""
@@ -244,7 +713,61 @@ class PerplexityAPI:
             }
         ]
 
-        return self._make_request(messages)
+        return self._make_request(messages, cache=True)
+
+    def get_best_practices_batch(self, tasks: List[str], language: str = "python",
+                                 group_size: int = 5) -> List[Optional[str]]:
+        """Get best practices for several tasks with as few requests as possible
+
+        Tasks are sent ``group_size`` at a time as a numbered list in a
+        single request, and the groups themselves run concurrently. A
+        group whose reply cannot be parsed back into one answer per task
+        falls back to individual ``get_best_practices`` calls.
+
+        Returns:
+            One answer (or None) per task, in order
+        """
+        if len(tasks) <= 1:
+            return [self.get_best_practices(task, language) for task in tasks]
+
+        groups = [tasks[i:i + group_size] for i in range(0, len(tasks), group_size)]
+        answers = self.batch([
+            (lambda group=group: self._best_practices_group(group, language)) for group in groups
+        ])
+        return [answer for group_answers in answers for answer in group_answers]
+
+    def _best_practices_group(self, tasks: List[str], language: str) -> List[Optional[str]]:
+        """Ask for best practices on several tasks in one request"""
+        if len(tasks) == 1:
+            return [self.get_best_practices(tasks[0], language)]
+
+        numbered = "\n\n".join(f"{i}. {task}" for i, task in enumerate(tasks, 1))
+        messages = [
+            {
+                "role": "system",
+                "content": f"You are a {language} expert. Provide current best practices and patterns."
+            },
+            {
+                "role": "user",
+                "content": (
+                    f"For each numbered item below, what are the best practices in {language}? "
+                    f"Include modern approaches and common pitfalls to avoid.\n\n{numbered}\n\n"
+                    f"Reply with ONLY a JSON array of {len(tasks)} strings, one answer per item, in order."
+                )
+            }
+        ]
+
+        response = self._make_request(messages, max_tokens=min(4096, 768 * len(tasks)), cache=True)
+        if response:
+            start, end = response.find('['), response.rfind(']')
+            try:
+                parsed = _loads(response[start:end + 1].encode('utf-8')) if start != -1 else None
+            except ValueError:
+                parsed = None
+            if isinstance(parsed, list) and len(parsed) == len(tasks):
+                return [str(answer) if answer else None for answer in parsed]
+
+        return [self.get_best_practices(task, language) for task in tasks]
 
     def suggest_libraries(self, task: str, language: str = "python") -> Optional[str]:
         """Suggest appropriate libraries for a task"""
@@ -260,3 +783,7 @@ class PerplexityAPI:
         ]
 
         return self._make_request(messages, max_tokens=512)
+
+
+# Close pooled keep-alive sockets on interpreter exit
+atexit.register(PerplexityAPI.close_all)
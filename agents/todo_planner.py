@@ -1,9 +1,49 @@
 """Todo and task planning agent"""
 import json
+import os
+import re
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+# Optional: orjson encodes/decodes the snapshot and log in C, straight to bytes
+try:
+    import orjson
+
+    def _dumps(obj) -> bytes:
+        return orjson.dumps(obj)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    def _loads(data: bytes):
+        return json.loads(data)
+
+# Tokenizes a plan line in one match: optional "N." / "N)" prefix, then
+# lookaheads capture the leading action keyword and the first file path
+# (with the text after it), and 'body' takes the rest of the line
+_TASK_RE = re.compile(
+    r'(?:\d+[.)]\s*)?'
+    r'(?=(?i:(?P<action>create|edit|delete|research|debug|test|refactor)))?'
+    r'(?=.*?(?P<file>[a-zA-Z0-9_/.-]+\.[a-zA-Z]+)(?P<desc>.*))?'
+    r'(?P<body>.*)'
+)
+
+# Short requests skip Perplexity research unless they mention one of these
+_WORD_RE = re.compile(r'[a-z0-9]+')
+_RESEARCH_KEYWORDS = frozenset({
+    'scrape', 'stock', 'api', 'library', 'framework', 'deploy', 'authenticate', 'oauth'
+})
+_RESEARCH_MIN_WORDS = 8
+
+# Compact the event log once it holds this many events per todo
+_LOG_COMPACT_RATIO = 4
+_LOG_COMPACT_MIN = 64
+
+
 class TodoPlanner:
     """Plans and manages tasks from natural language requests"""
 
@@ -12,38 +52,163 @@ class TodoPlanner:
         self.model = model_manager
         self.perplexity = perplexity_api
         self.todos_file = config.memory_dir / "todos.json"
+        # Mutations are appended here and folded into todos.json on compaction
+        self.todos_log = config.memory_dir / "todos.jsonl"
+        self._seq = 0
+        self._log_events = 0
         self.todos = self._load_todos()
+        # True while the snapshot lags behind the in-memory list
+        self._dirty = self._log_events > 0
+        # Indices of pending todos in order; entries that stopped being
+        # pending are dropped lazily by get_next_task
+        self._pending = deque()
+        self._pending_view = None
+        self._index_pending()
 
     def _load_todos(self) -> List[Dict[str, Any]]:
-        """Load todos from disk"""
+        """Load the todo snapshot from disk and replay the event log on top"""
+        todos = []
+        snapshot_seq = 0
         if self.todos_file.exists():
             try:
-                with open(self.todos_file, 'r') as f:
-                    return json.load(f)
+                with open(self.todos_file, 'rb') as f:
+                    data = _loads(f.read())
+                # Older versions stored a bare list
+                if isinstance(data, dict):
+                    todos = data.get('todos', [])
+                    snapshot_seq = data.get('seq', 0)
+                else:
+                    todos = data
             except Exception as e:
                 print(f"Warning: Could not load todos: {e}")
-                return []
-        return []
+                todos = []
+
+        self._seq = snapshot_seq
+        if self.todos_log.exists():
+            try:
+                with open(self.todos_log, 'rb') as f:
+                    for line in f:
+                        try:
+                            event = _loads(line)
+                        except ValueError:
+                            # Torn final line from an interrupted write
+                            continue
+                        # Events already folded into the snapshot are skipped
+                        if event.get('seq', 0) <= snapshot_seq:
+                            continue
+                        self._apply_event(todos, event)
+                        self._seq = event['seq']
+                        self._log_events += 1
+            except OSError as e:
+                print(f"Warning: Could not replay todo log: {e}")
+
+        return todos
+
+    @staticmethod
+    def _apply_event(todos: List[Dict[str, Any]], event: Dict[str, Any]):
+        """Apply one logged mutation to a todo list"""
+        op = event['op']
+        if op == 'add':
+            todos.extend(event['todos'])
+        elif op == 'set':
+            if 0 <= event['id'] < len(todos):
+                todos[event['id']].update(event['fields'])
+        elif op == 'clear_completed':
+            todos[:] = [t for t in todos if t['status'] != 'completed']
+
+    def _index_pending(self):
+        """Rebuild the pending-task index from scratch"""
+        self._pending = deque(i for i, t in enumerate(self.todos) if t['status'] == 'pending')
+        self._pending_view = None
+
+    def _record(self, event: Dict[str, Any]):
+        """Apply a mutation in memory and append it to the event log
+
+        Appending one line keeps each mutation O(1) on disk; the full
+        snapshot is only rewritten once the log grows well past the
+        number of todos.
+        """
+        start = len(self.todos)
+        self._apply_event(self.todos, event)
+        self._dirty = True
+        if event['op'] == 'add':
+            self._pending.extend(i for i in range(start, len(self.todos))
+                                 if self.todos[i]['status'] == 'pending')
+            self._pending_view = None
+        elif event['op'] == 'clear_completed':
+            # Positions shift when completed todos are removed
+            self._index_pending()
+        elif 'status' in event['fields']:
+            self._pending_view = None
+        self._seq += 1
+        event['seq'] = self._seq
+        try:
+            with open(self.todos_log, 'ab') as f:
+                f.write(_dumps(event) + b'\n')
+            self._log_events += 1
+        except Exception as e:
+            print(f"Warning: Could not save todos: {e}")
+            return
+
+        if self._log_events > max(_LOG_COMPACT_MIN, _LOG_COMPACT_RATIO * len(self.todos)):
+            self._save_todos()
 
     def _save_todos(self):
-        """Save todos to disk"""
+        """Write a full snapshot to disk and truncate the event log"""
+        if not self._dirty:
+            return
+        tmp_file = self.todos_file.with_name(self.todos_file.name + '.tmp')
         try:
-            with open(self.todos_file, 'w') as f:
-                json.dump(self.todos, f, indent=2)
+            with open(tmp_file, 'wb') as f:
+                f.write(_dumps({'seq': self._seq, 'todos': self.todos}))
+            os.replace(tmp_file, self.todos_file)
+            # Safe even if interrupted: replay skips events up to 'seq'
+            with open(self.todos_log, 'w'):
+                pass
+            self._log_events = 0
+            self._dirty = False
         except Exception as e:
             print(f"Warning: Could not save todos: {e}")
 
     def create_plan(self, request: str) -> Dict[str, Any]:
         """Create a structured plan from natural language request"""
-        # Use Perplexity to enhance understanding if available
-        context = None
-        if self.perplexity:
-            research = self.perplexity.research_topic(
-                f"How to implement: {request}",
-                context="Break this into specific development steps"
-            )
-            context = research
+        # Use Perplexity to enhance understanding if available and worthwhile
+        context = self._research(request) if self.perplexity and self._needs_research(request) else None
+        return self._plan_with_context(request, context)
 
+    def create_plans(self, requests: List[str]) -> List[Dict[str, Any]]:
+        """Create plans for several requests
+
+        Perplexity research for every request is fetched concurrently up
+        front; the local model then plans each request in turn.
+        """
+        contexts = [None] * len(requests)
+        if self.perplexity:
+            pending = [i for i, request in enumerate(requests) if self._needs_research(request)]
+            if pending:
+                results = self.perplexity.batch([
+                    (lambda request=requests[i]: self._research(request)) for i in pending
+                ])
+                for i, context in zip(pending, results):
+                    contexts[i] = context
+        return [self._plan_with_context(request, context)
+                for request, context in zip(requests, contexts)]
+
+    @staticmethod
+    def _needs_research(request: str) -> bool:
+        """Whether a request is involved enough to justify a Perplexity call"""
+        words = _WORD_RE.findall(request.lower())
+        return len(words) >= _RESEARCH_MIN_WORDS or not _RESEARCH_KEYWORDS.isdisjoint(words)
+
+    def _research(self, request: str) -> Optional[str]:
+        """Ask Perplexity how to approach a request"""
+        return self.perplexity.research_topic(
+            f"How to implement: {request}",
+            context="Break this into specific development steps"
+        )
+
+    def _plan_with_context(self, request: str, context: Optional[str]) -> Dict[str, Any]:
+        """Generate, parse and store a plan using optional research context"""
         # Generate plan using local model with optional Perplexity context
         prompt = self._build_planning_prompt(request, context)
 
@@ -52,8 +217,7 @@ class TodoPlanner:
             todos = self._parse_plan(plan_text, request)
 
             # Save todos
-            self.todos.extend(todos)
-            self._save_todos()
+            self._record({'op': 'add', 'todos': todos})
 
             return {
                 'success': True,
@@ -118,35 +282,18 @@ Tasks:
 
     def _parse_task_line(self, line: str) -> Optional[Dict[str, Any]]:
         """Parse a single task line"""
-        import re
-
-        # Remove number prefix
-        line = re.sub(r'^\d+[\.\)]\s*', '', line)
+        m = _TASK_RE.match(line)
+        action = m.group('action')
+        target_file = m.group('file')
 
-        # Extract action
-        actions = ['create', 'edit', 'delete', 'research', 'debug', 'test', 'refactor']
-        action = None
-        for act in actions:
-            if line.lower().startswith(act):
-                action = act
-                break
-
-        if not action:
-            action = 'general'
-
-        # Extract file if present
-        file_match = re.search(r'([a-zA-Z0-9_/\.-]+\.[a-zA-Z]+)', line)
-        target_file = file_match.group(1) if file_match else None
-
-        # Extract description (everything after file or action)
+        # Description is everything after the file, or the whole task text
         if target_file:
-            parts = line.split(target_file, 1)
-            description = parts[1].strip().lstrip(':').strip() if len(parts) > 1 else line
+            description = m.group('desc').strip().lstrip(':').strip()
         else:
-            description = line
+            description = m.group('body')
 
         return {
-            'action': action,
+            'action': action.lower() if action else 'general',
             'file': target_file,
             'description': description,
             'dependencies': [],
@@ -155,35 +302,39 @@ Tasks:
 
     def get_next_task(self) -> Optional[Dict[str, Any]]:
         """Get the next pending task"""
-        for todo in self.todos:
+        pending = self._pending
+        while pending:
+            todo = self.todos[pending[0]]
             if todo['status'] == 'pending':
                 return todo
+            pending.popleft()
         return None
 
     def mark_completed(self, task_id: int):
         """Mark a task as completed"""
         if 0 <= task_id < len(self.todos):
-            self.todos[task_id]['status'] = 'completed'
-            self.todos[task_id]['completed'] = datetime.now().isoformat()
-            self._save_todos()
+            self._record({'op': 'set', 'id': task_id, 'fields': {
+                'status': 'completed',
+                'completed': datetime.now().isoformat()
+            }})
 
     def mark_failed(self, task_id: int, error: str):
         """Mark a task as failed"""
         if 0 <= task_id < len(self.todos):
-            self.todos[task_id]['status'] = 'failed'
-            self.todos[task_id]['error'] = error
-            self._save_todos()
+            self._record({'op': 'set', 'id': task_id, 'fields': {
+                'status': 'failed',
+                'error': error
+            }})
 
     def add_note(self, task_id: int, note: str):
         """Add a note to a task"""
         if 0 <= task_id < len(self.todos):
-            if 'notes' not in self.todos[task_id] or self.todos[task_id]['notes'] is None:
-                self.todos[task_id]['notes'] = []
-            self.todos[task_id]['notes'].append({
+            notes = list(self.todos[task_id].get('notes') or [])
+            notes.append({
                 'timestamp': datetime.now().isoformat(),
                 'note': note
             })
-            self._save_todos()
+            self._record({'op': 'set', 'id': task_id, 'fields': {'notes': notes}})
 
     def get_all_todos(self) -> List[Dict[str, Any]]:
         """Get all todos"""
@@ -191,14 +342,20 @@ Tasks:
 
     def get_pending_todos(self) -> List[Dict[str, Any]]:
         """Get pending todos"""
-        return [t for t in self.todos if t['status'] == 'pending']
+        if self._pending_view is None:
+            todos = self.todos
+            self._pending_view = [todos[i] for i in self._pending if todos[i]['status'] == 'pending']
+        return self._pending_view
 
     def clear_completed(self):
         """Remove completed todos"""
-        self.todos = [t for t in self.todos if t['status'] != 'completed']
-        self._save_todos()
+        if not any(t['status'] == 'completed' for t in self.todos):
+            return
+        self._record({'op': 'clear_completed'})
 
     def clear_all(self):
         """Clear all todos"""
         self.todos = []
+        self._dirty = True
+        self._index_pending()
         self._save_todos()
@@ -1,16 +1,30 @@
+# -*- coding: utf-8 -*-
 """ANSI color utilities for Codey CLI - Termux compatible"""
 import sys
 import os
 
 # Check if terminal supports colors
 def supports_color():
-    """Check if the terminal supports ANSI colors"""
+    """Check if the terminal supports ANSI colors
+
+    Honors the NO_COLOR (https://no-color.org) and FORCE_COLOR conventions.
+    """
+    env = os.environ
+    if env.get('NO_COLOR'):
+        return False
+    if env.get('FORCE_COLOR'):
+        return True
+
     # Check if stdout is a terminal
     if not hasattr(sys.stdout, 'isatty') or not sys.stdout.isatty():
         return False
 
+    # Classic Windows consoles only understand ANSI through a helper
+    if os.name == 'nt' and 'ANSICON' not in env and 'WT_SESSION' not in env:
+        return False
+
     # Check TERM environment variable
-    term = os.environ.get('TERM', '')
+    term = env.get('TERM', '')
     if term in ('dumb', 'unknown'):
         return False
 
@@ -47,44 +61,39 @@ class Colors:
 # Disable colors if not supported
 COLORS_ENABLED = supports_color()
 
-def colorize(text: str, color: str) -> str:
-    """Apply color to text if colors are enabled"""
-    if not COLORS_ENABLED:
+# Wrappers are specialized once here rather than checking COLORS_ENABLED per call
+if COLORS_ENABLED:
+    def colorize(text: str, color: str) -> str:
+        """Apply color to text if colors are enabled"""
+        return color + text + Colors.RESET
+
+    def _wrapper(prefix: str, name: str, doc: str, lead: str = ''):
+        """Build a formatter that wraps lead + text in a fixed escape sequence"""
+        head = prefix + lead
+        def wrap(text: str) -> str:
+            return head + text + Colors.RESET
+        wrap.__name__, wrap.__doc__ = name, doc
+        return wrap
+else:
+    def colorize(text: str, color: str) -> str:
+        """Apply color to text if colors are enabled"""
         return text
-    return f"{color}{text}{Colors.RESET}"
-
-# Semantic color functions
-def success(text: str) -> str:
-    """Format text as success (green)"""
-    return colorize(text, Colors.GREEN)
-
-def error(text: str) -> str:
-    """Format text as error (red)"""
-    return colorize(text, Colors.RED)
-
-def warning(text: str) -> str:
-    """Format text as warning (yellow)"""
-    return colorize(text, Colors.YELLOW)
 
-def info(text: str) -> str:
-    """Format text as info (cyan)"""
-    return colorize(text, Colors.CYAN)
+    def _wrapper(prefix: str, name: str, doc: str, lead: str = ''):
+        """Build a formatter that only prepends lead to the text"""
+        def wrap(text: str) -> str:
+            return lead + text
+        wrap.__name__, wrap.__doc__ = name, doc
+        return wrap
 
-def permission(text: str) -> str:
-    """Format text as permission request (magenta)"""
-    return colorize(text, Colors.MAGENTA)
-
-def bold(text: str) -> str:
-    """Make text bold"""
-    if not COLORS_ENABLED:
-        return text
-    return f"{Colors.BOLD}{text}{Colors.RESET}"
-
-def dim(text: str) -> str:
-    """Make text dim"""
-    if not COLORS_ENABLED:
-        return text
-    return f"{Colors.DIM}{text}{Colors.RESET}"
+# Semantic color functions
+success = _wrapper(Colors.GREEN, 'success', "Format text as success (green)")
+error = _wrapper(Colors.RED, 'error', "Format text as error (red)")
+warning = _wrapper(Colors.YELLOW, 'warning', "Format text as warning (yellow)")
+info = _wrapper(Colors.CYAN, 'info', "Format text as info (cyan)")
+permission = _wrapper(Colors.MAGENTA, 'permission', "Format text as permission request (magenta)")
+bold = _wrapper(Colors.BOLD, 'bold', "Make text bold")
+dim = _wrapper(Colors.DIM, 'dim', "Make text dim")
 
 # Icons (using Unicode, works in Termux)
 class Icons:
@@ -107,23 +116,9 @@ class Icons:
     CROSS = "❌"
     CIRCLE = "○"
 
-# Formatted status messages
-def success_msg(msg: str) -> str:
-    """Format a success message"""
-    return success(f"{Icons.SUCCESS} {msg}")
-
-def error_msg(msg: str) -> str:
-    """Format an error message"""
-    return error(f"{Icons.ERROR} {msg}")
-
-def warning_msg(msg: str) -> str:
-    """Format a warning message"""
-    return warning(f"{Icons.WARNING} {msg}")
-
-def info_msg(msg: str) -> str:
-    """Format an info message"""
-    return info(f"{Icons.INFO} {msg}")
-
-def permission_msg(msg: str) -> str:
-    """Format a permission request message"""
-    return permission(f"{Icons.LOCK} {msg}")
+# Formatted status messages (icon prefix is baked in once at import)
+success_msg = _wrapper(Colors.GREEN, 'success_msg', "Format a success message", Icons.SUCCESS + " ")
+error_msg = _wrapper(Colors.RED, 'error_msg', "Format an error message", Icons.ERROR + " ")
+warning_msg = _wrapper(Colors.YELLOW, 'warning_msg', "Format a warning message", Icons.WARNING + " ")
+info_msg = _wrapper(Colors.CYAN, 'info_msg', "Format an info message", Icons.INFO + " ")
+permission_msg = _wrapper(Colors.MAGENTA, 'permission_msg', "Format a permission request message", Icons.LOCK + " ")
@@ -2,21 +2,23 @@
 """Codey CLI - Interactive command-line interface"""
 import sys
 import os
+import atexit
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.engine_v2 import CodeyEngineV2 as CodeyEngine
 from cli.colors import (
     success, error, warning, info, bold, dim,
     success_msg, error_msg, warning_msg, info_msg,
     Icons
 )
 
-def print_banner():
-    """Print Codey banner"""
-    banner = """
+# Banner and help text are assembled once; colors are fixed at import time
+_BANNER = """
 ╔═══════════════════════════════════════════════╗
 ║                                               ║
 ║   ██████╗ ██████╗ ██████╗ ███████╗██╗   ██╗  ║
@@ -31,137 +33,358 @@ def print_banner():
 ║                                               ║
 ╚═══════════════════════════════════════════════╝
 """
-    print(banner)
 
-def print_help():
-    """Print help information with colors and categories"""
-    print(f"\n{bold('═' * 60)}")
-    print(f"{bold(info('  CODEY COMMAND REFERENCE'))}")
-    print(f"{bold('═' * 60)}\n")
+_HR = bold('═' * 60)
+
+_HELP_LINES = (
+    f"\n{_HR}",
+    f"{bold(info('  CODEY COMMAND REFERENCE'))}",
+    f"{_HR}\n",
 
     # File Operations
-    print(f"{bold(success(f'{Icons.FILE} FILE OPERATIONS'))}")
-    print(f"  {info('create')} <filename> <description>  - Create a new file")
-    print(f"  {info('edit')} <filename> <changes>        - Edit an existing file")
-    print(f"  {info('read')} <filename>                  - Display file contents")
-    print(f"  {info('delete')} <filename>                - Delete a file")
-    print(f"  {info('list')} files                       - List all files in workspace")
-    print()
+    f"{bold(success(f'{Icons.FILE} FILE OPERATIONS'))}",
+    f"  {info('create')} <filename> <description>  - Create a new file",
+    f"  {info('edit')} <filename> <changes>        - Edit an existing file",
+    f"  {info('read')} <filename>                  - Display file contents",
+    f"  {info('delete')} <filename>                - Delete a file",
+    f"  {info('list')} files                       - List all files in workspace",
+    "",
 
     # Git Operations
-    print(f"{bold(success(f'{Icons.GIT} GIT OPERATIONS'))}")
-    print(f"  {info('clone')} <url> [destination]        - Clone a repository")
-    print(f"  {info('git status')}                       - Check git status")
-    print(f"  {info('commit')} with message \"msg\"       - Commit changes")
-    print(f"  {info('push')} [remote] [branch]           - Push to remote")
-    print(f"  {info('pull')} [remote] [branch]           - Pull from remote")
-    print(f"  {info('git init')}                         - Initialize git repository")
-    print()
+    f"{bold(success(f'{Icons.GIT} GIT OPERATIONS'))}",
+    f"  {info('clone')} <url> [destination]        - Clone a repository",
+    f"  {info('git status')}                       - Check git status",
+    f"  {info('commit')} with message \"msg\"       - Commit changes",
+    f"  {info('push')} [remote] [branch]           - Push to remote",
+    f"  {info('pull')} [remote] [branch]           - Pull from remote",
+    f"  {info('git init')}                         - Initialize git repository",
+    "",
 
     # Shell Operations
-    print(f"{bold(success(f'{Icons.SHELL} SHELL OPERATIONS'))}")
-    print(f"  {info('mkdir')} <directory>                - Create directory")
-    print(f"  {info('install')} <package>                - Install Python package")
-    print(f"  {info('install')} requirements.txt         - Install from requirements.txt")
-    print(f"  {info('run')} <filename>                   - Run Python file")
-    print(f"  {info('execute')} <command>                - Run shell command")
-    print()
+    f"{bold(success(f'{Icons.SHELL} SHELL OPERATIONS'))}",
+    f"  {info('mkdir')} <directory>                - Create directory",
+    f"  {info('install')} <package>                - Install Python package",
+    f"  {info('install')} requirements.txt         - Install from requirements.txt",
+    f"  {info('run')} <filename>                   - Run Python file",
+    f"  {info('execute')} <command>                - Run shell command",
+    "",
 
     # Advanced Features
-    print(f"{bold(success(f'{Icons.ROBOT} ADVANCED FEATURES'))}")
-    print(f"  {info('plan')} <task>                      - Create autonomous task plan")
-    print(f"  {info('execute plan')}                     - Run current plan")
-    print(f"  {info('show plan')}                        - Display current plan")
-    print(f"  {info('debug')} <file>                     - Analyze file for issues")
-    print(f"  {info('ask')} <question>                   - Query Perplexity API")
-    print(f"  {info('info')}                             - Show system information")
-    print()
+    f"{bold(success(f'{Icons.ROBOT} ADVANCED FEATURES'))}",
+    f"  {info('plan')} <task>                      - Create autonomous task plan",
+    f"  {info('execute plan')}                     - Run current plan",
+    f"  {info('show plan')}                        - Display current plan",
+    f"  {info('debug')} <file>                     - Analyze file for issues",
+    f"  {info('ask')} <question>                   - Query Perplexity API",
+    f"  {info('info')}                             - Show system information",
+    "",
 
     # Natural Language
-    print(f"{bold(success(f'{Icons.WRENCH} NATURAL LANGUAGE'))}")
-    print(f"  {dim('Keep commands simple and direct!')}")
-    print(f"  {dim('Examples:')}")
-    print(f"    • {info('create hello.py that prints hello world')}")
-    print(f"    • {info('clone https://github.com/user/repo ~/MyProject')}")
-    print(f"    • {info('install numpy')}")
-    print()
+    f"{bold(success(f'{Icons.WRENCH} NATURAL LANGUAGE'))}",
+    f"  {dim('Keep commands simple and direct!')}",
+    f"  {dim('Examples:')}",
+    f"    • {info('create hello.py that prints hello world')}",
+    f"    • {info('clone https://github.com/user/repo ~/MyProject')}",
+    f"    • {info('install numpy')}",
+    "",
 
     # System Commands
-    print(f"{bold(success('SYSTEM COMMANDS'))}")
-    print(f"  {info('help, ?')}          - Show this help")
-    print(f"  {info('clear')}             - Clear screen")
-    print(f"  {info('exit, quit')}        - Exit Codey")
-    print()
+    f"{bold(success('SYSTEM COMMANDS'))}",
+    f"  {info('help, ?')}          - Show this help",
+    f"  {info('clear')}             - Clear screen",
+    f"  {info('exit, quit')}        - Exit Codey",
+    "",
 
     # Tips
-    print(f"{bold(warning(f'{Icons.INFO} TIPS'))}")
-    print(f"  • Use ONE command at a time for best results")
-    print(f"  • Supports ~/ for home directory paths")
-    print(f"  • Git/shell operations work anywhere on your device")
-    print(f"  • All operations require permission approval")
-    print()
-    print(f"{bold('═' * 60)}\n")
+    f"{bold(warning(f'{Icons.INFO} TIPS'))}",
+    "  • Use ONE command at a time for best results",
+    "  • Supports ~/ for home directory paths",
+    "  • Git/shell operations work anywhere on your device",
+    "  • All operations require permission approval",
+    "",
+    f"{_HR}\n",
+)
+
+_HELP = "\n".join(_HELP_LINES) + "\n"
+
+# Pre-encoded copies for writing straight to the binary stdout buffer
+_BANNER_BYTES = (_BANNER + "\n").encode('utf-8')
+_HELP_BYTES = _HELP.encode('utf-8')
+
+def _write_static(text, data):
+    """Write pre-encoded static text, skipping the text layer when possible
+
+    Falls back to a normal text write when stdout has no binary buffer
+    or does not use UTF-8.
+    """
+    stdout = sys.stdout
+    buffer = getattr(stdout, 'buffer', None)
+    if buffer is None or (getattr(stdout, 'encoding', None) or '').lower() not in ('utf-8', 'utf8'):
+        stdout.write(text)
+        stdout.flush()
+        return
+    # Anything already written through the text layer must come first
+    stdout.flush()
+    buffer.write(data)
+    buffer.flush()
+
+def print_banner():
+    """Print Codey banner"""
+    _write_static(_BANNER + "\n", _BANNER_BYTES)
+
+def print_help():
+    """Print help information with colors and categories"""
+    _write_static(_HELP, _HELP_BYTES)
+
+# Erase display, cursor home
+_CLEAR_SEQ = '\033[2J\033[H'
+_CLEAR_BYTES = _CLEAR_SEQ.encode('ascii')
+
+def _is_ansi_terminal():
+    """Whether stdout is a terminal that understands ANSI escapes
+
+    Unlike COLORS_ENABLED this ignores NO_COLOR/FORCE_COLOR, which are
+    about color preference rather than terminal capability.
+    """
+    if not hasattr(sys.stdout, 'isatty') or not sys.stdout.isatty():
+        return False
+    if os.name == 'nt' and 'ANSICON' not in os.environ and 'WT_SESSION' not in os.environ:
+        return False
+    return os.environ.get('TERM', '') not in ('dumb', 'unknown')
 
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('clear' if os.name != 'nt' else 'cls')
+    if _is_ansi_terminal():
+        # An ANSI-capable terminal can be cleared without spawning a shell
+        _write_static(_CLEAR_SEQ, _CLEAR_BYTES)
+    else:
+        os.system('clear' if os.name != 'nt' else 'cls')
+
+# Words offered by tab completion: command words at the start of a line,
+# and fixed second words for the commands that take one
+_COMMANDS = (
+    'create', 'edit', 'read', 'delete', 'list', 'clone', 'git', 'commit',
+    'push', 'pull', 'mkdir', 'install', 'run', 'execute', 'plan', 'show',
+    'debug', 'ask', 'info', 'help', 'clear', 'exit', 'quit'
+)
+_SUBCOMMANDS = {
+    'execute': ('plan',),
+    'show': ('plan',),
+    'list': ('files',),
+    'git': ('status', 'init'),
+}
+
+def _build_completions():
+    """Map (previous word, typed prefix) to its candidates, built once"""
+    table = {}
+    for context, words in (('', _COMMANDS), *_SUBCOMMANDS.items()):
+        for word in words:
+            for end in range(len(word) + 1):
+                table.setdefault((context, word[:end]), []).append(word + ' ')
+    return {key: tuple(matches) for key, matches in table.items()}
+
+_COMPLETIONS = _build_completions()
+
+def _complete(text, state):
+    """readline completer for the first two words of a command"""
+    import readline
+    previous = readline.get_line_buffer()[:readline.get_begidx()].split()
+    if len(previous) > 1:
+        return None
+    context = previous[0].lower() if previous else ''
+    matches = _COMPLETIONS.get((context, text.lower()), ())
+    return matches[state] if state < len(matches) else None
+
+def setup_readline():
+    """Enable line editing, persistent history and command completion"""
+    try:
+        import readline
+    except ImportError:
+        return
+
+    histfile = str(Path.home() / '.codey_history')
+    try:
+        readline.read_history_file(histfile)
+    except OSError:
+        pass
+    readline.set_history_length(1000)
+
+    def save_history():
+        try:
+            readline.write_history_file(histfile)
+        except OSError:
+            pass
+    atexit.register(save_history)
+
+    readline.set_completer(_complete)
+    readline.parse_and_bind('tab: complete')
+
+# REPL commands handled without the engine
+_EXIT_COMMANDS = frozenset({'exit', 'quit', 'q'})
+_HELP_COMMANDS = frozenset({'help', '?', 'h'})
+_CLEAR_COMMANDS = frozenset({'clear', 'cls'})
+
+# Fixed REPL messages, colored once at import
+_MSG_INIT = f"\n{info_msg('Initializing Codey...')}\n"
+_MSG_READY = f"{success_msg('Ready!')} Type {info('help')} for commands or start coding.\n"
+_MSG_MODEL_NOT_FOUND = (
+    f"\n{error_msg('Model not found')}\n"
+    f"\n{warning('Please ensure you have a GGUF model in ~/codey/LLM_Models/')}\n"
+    f"{warning('Or update config.json with the correct model path.')}"
+)
+_MSG_WAITING = dim("Waiting for the interrupted command to finish (answer any prompt it shows)...")
+_MSG_SHUTDOWN = f"\n{info_msg('Shutting down Codey...')}"
+_MSG_GOODBYE = f"{success_msg('Goodbye!')}\n"
+_MSG_INTERRUPTED = f"\n\n{warning_msg('Interrupted')} Type {info('exit')} to quit or continue working."
+
+def _split_message(formatter, template):
+    """Pre-color a message around a single '{}' slot, returning (head, tail)"""
+    head, tail = formatter(template.replace('{}', '\0')).split('\0')
+    return "\n" + head, tail + "\n"
+
+# Banner and initialization notice shown together at startup
+_STARTUP = _BANNER + "\n" + _MSG_INIT + "\n"
+_STARTUP_BYTES = _STARTUP.encode('utf-8')
+
+# Colored text surrounding exception messages
+_ERR_HEAD, _ERR_TAIL = _split_message(error_msg, 'Error: {}')
+_INIT_ERR_HEAD, _INIT_ERR_TAIL = _split_message(error_msg, 'Failed to initialize Codey: {}')
+
+# Marks the end of a command's output on the chunk queue
+_DONE = object()
+
+def submit_command(executor, engine, user_input, cancelled):
+    """Start a command on the engine thread
+
+    Output chunks are put on the returned queue, followed by ``_DONE``;
+    an exception raised by the engine is put on the queue in place of
+    further output. Setting ``cancelled`` makes the engine thread stop
+    at the next chunk. Returns ``(future, chunks)``.
+    """
+    chunks = queue.Queue()
+
+    def produce():
+        try:
+            stream = engine.process_command_stream(user_input)
+            try:
+                for chunk in stream:
+                    if cancelled.is_set():
+                        break
+                    chunks.put(chunk)
+            finally:
+                stream.close()
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            chunks.put(_DONE)
+
+    return executor.submit(produce), chunks
+
+def write_output(chunks):
+    """Write command output as it arrives
+
+    The prompt thread only blocks on the queue, so Ctrl-C is handled at
+    once even while the model is busy in native code.
+    """
+    sys.stdout.write("\n")
+    while True:
+        chunk = chunks.get()
+        if chunk is _DONE:
+            break
+        if isinstance(chunk, Exception):
+            raise chunk
+        sys.stdout.write(chunk)
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+def wait_for_command(future):
+    """Block until the engine thread has finished its command
+
+    The engine may be reading a confirmation from stdin, so further
+    Ctrl-C presses are swallowed rather than letting the prompt start a
+    second reader alongside it.
+    """
+    while not future.done():
+        try:
+            wait((future,), timeout=0.5)
+        except KeyboardInterrupt:
+            continue
 
 def interactive_mode():
     """Run Codey in interactive mode"""
-    print_banner()
-    print(f"\n{info_msg('Initializing Codey...')}\n")
+    # Imported here so --help/--version do not load the model stack
+    from core.engine_v2 import CodeyEngineV2 as CodeyEngine
+
+    setup_readline()
+    _write_static(_STARTUP, _STARTUP_BYTES)
 
     try:
         engine = CodeyEngine()
-        print(f"{success_msg('Ready!')} Type {info('help')} for commands or start coding.\n")
+        print(_MSG_READY)
     except FileNotFoundError as e:
-        print(f"\n{error_msg('Model not found')}")
-        print(f"\n{warning('Please ensure you have a GGUF model in ~/codey/LLM_Models/')}")
-        print(f"{warning('Or update config.json with the correct model path.')}")
+        print(_MSG_MODEL_NOT_FOUND)
         sys.exit(1)
     except Exception as e:
-        print(f"\n{error_msg(f'Failed to initialize Codey: {e}')}")
+        sys.stdout.write(_INIT_ERR_HEAD + str(e) + _INIT_ERR_TAIL)
         sys.exit(1)
 
+    # Commands run one at a time on a dedicated engine thread
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='codey-engine')
+    cancelled = threading.Event()
+    running = None
+
     # Main interaction loop
     while True:
         try:
+            # An interrupted command may still be finishing (or waiting on a
+            # confirmation prompt); let it complete before reading new input
+            if running is not None and not running.done():
+                print(_MSG_WAITING)
+                wait_for_command(running)
+            running = None
+
             user_input = input("\ncodey> ").strip()
 
             if not user_input:
                 continue
 
             # Handle system commands
-            if user_input.lower() in ['exit', 'quit', 'q']:
-                print(f"\n{info_msg('Shutting down Codey...')}")
+            command = user_input.lower()
+            if command in _EXIT_COMMANDS:
+                print(_MSG_SHUTDOWN)
+                executor.shutdown(wait=False)
                 engine.shutdown()
-                print(f"{success_msg('Goodbye!')}\n")
+                print(_MSG_GOODBYE)
                 break
 
-            elif user_input.lower() in ['help', '?', 'h']:
+            elif command in _HELP_COMMANDS:
                 print_help()
                 continue
 
-            elif user_input.lower() in ['clear', 'cls']:
+            elif command in _CLEAR_COMMANDS:
                 clear_screen()
                 print_banner()
                 continue
 
             # Process command through engine
-            response = engine.process_command(user_input)
-            print(f"\n{response}")
+            cancelled = threading.Event()
+            running, chunks = submit_command(executor, engine, user_input, cancelled)
+            write_output(chunks)
 
         except KeyboardInterrupt:
-            print(f"\n\n{warning_msg('Interrupted')} Type {info('exit')} to quit or continue working.")
+            cancelled.set()
+            print(_MSG_INTERRUPTED)
             continue
 
         except EOFError:
-            print(f"\n{info_msg('Shutting down Codey...')}")
+            print(_MSG_SHUTDOWN)
+            executor.shutdown(wait=False)
             engine.shutdown()
             break
 
         except Exception as e:
-            print(f"\n{error_msg(f'Error: {e}')}")
+            sys.stdout.write(_ERR_HEAD + str(e) + _ERR_TAIL)
             continue
 
 def main():
@@ -1,6 +1,28 @@
-"""Core package"""
-from .engine_v2 import CodeyEngineV2
-from .tools import FileTools
-from .parser import CommandParser
+"""Core package
+
+Exports are loaded on first access (PEP 562) so importing a light
+submodule such as core.parser does not pull in the llama.cpp-backed
+engine.
+"""
+from importlib import import_module
 
 __all__ = ['CodeyEngineV2', 'FileTools', 'CommandParser']
+
+_LAZY = {
+    'CodeyEngineV2': ('.engine_v2', 'CodeyEngineV2'),
+    'FileTools': ('.tools', 'FileTools'),
+    'CommandParser': ('.parser', 'CommandParser'),
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        module, attr = _LAZY[name]
+        value = getattr(import_module(module, __name__), attr)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
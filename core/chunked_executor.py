@@ -12,8 +12,64 @@ from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional, Callable, Generator
 from enum import Enum
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from queue import Queue
+import threading
+import hashlib
+import os
+import re
+import sys
 import time
 import json
+from collections import deque
+
+from utils.performance import estimate_tokens
+
+# Fenced code block in a model response, closed or cut off at the end
+_CODE_BLOCK_RE = re.compile(r'```\w*\n(.*?)```', re.DOTALL)
+_CODE_BLOCK_OPEN_RE = re.compile(r'```\w*\n(.*?)$', re.DOTALL)
+
+# Explicit filename mentioned in a task, e.g. "calc.py"
+_FILENAME_RE = re.compile(r'([a-zA-Z0-9_.-]+\.[a-zA-Z0-9]+)')
+
+# Fallback filenames by task keyword, highest priority first
+_FILENAME_KEYWORDS = {
+    'calculator': 'calculator.py',
+    'game': 'game.py',
+    'server': 'app.py',
+    'api': 'app.py',
+    'test': 'test_main.py',
+}
+_FILENAME_KEYWORD_RE = re.compile(r'\b(' + '|'.join(_FILENAME_KEYWORDS) + ')')
+
+# File delimiter in fused multi-chunk responses
+_FILE_MARKER_RE = re.compile(r'^--- FILE: (.+?) ---[ \t]*\n?', re.MULTILINE)
+
+# Task keywords used by analyze_task. Single words are matched against
+# the task's words; phrases are few and checked as substrings.
+_TASK_WORD_RE = re.compile(r'[a-z]+')
+_FULLSTACK_KW = frozenset({'fullstack'})
+_FULLSTACK_PHRASES = (
+    'full-stack', 'full stack', 'frontend and backend', 'backend and frontend',
+    'web app', 'web application'
+)
+_BACKEND_KW = frozenset({
+    'flask', 'fastapi', 'django', 'backend', 'api', 'apis', 'server', 'servers',
+    'restful'
+})
+_FRONTEND_KW = frozenset({
+    'html', 'frontend', 'react', 'vue', 'angular', 'webpage', 'webpages',
+    'website', 'websites', 'ui'
+})
+_FRONTEND_PHRASES = ('user interface',)
+_DATABASE_KW = frozenset({
+    'database', 'databases', 'sqlite', 'postgres', 'mysql', 'db', 'sql', 'crud',
+    'persistence'
+})
+_DATABASE_PHRASES = ('data storage',)
+
+# Slotted dataclasses (3.10+) drop the per-instance __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
 
 
 class ChunkType(Enum):
@@ -33,7 +89,7 @@ class ChunkType(Enum):
     UTILITY = "utility"                      # Helper/utility code (~200 tokens)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class CodeChunk:
     """Represents a single chunk of code to generate"""
     chunk_id: str
@@ -47,9 +103,11 @@ class CodeChunk:
     result: Optional[str] = None
     error: Optional[str] = None
     generation_time: float = 0.0
+    context_snippet: str = ""  # Excerpt of result passed to dependents
+    fuse_group: Optional[str] = None  # Ready chunks in a group share one generation
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ChunkedPlan:
     """Complete plan for chunked code generation"""
     task_description: str
@@ -57,6 +115,148 @@ class ChunkedPlan:
     execution_order: List[str]  # chunk_ids in execution order
     estimated_total_time: float = 0.0  # Estimated time in seconds
     metadata: Dict[str, Any] = field(default_factory=dict)
+    dependents: Dict[str, List[str]] = field(default_factory=dict)  # chunk_id -> chunk_ids needing it
+    chunk_map: Dict[str, CodeChunk] = field(default_factory=dict, repr=False)  # chunk_id -> chunk
+
+
+def _prompt_backend_setup(chunk: CodeChunk) -> str:
+    return f"""Write Python Flask/FastAPI app initialization.
+File: {chunk.filename}
+{f'Context: {chunk.context[:300]}' if chunk.context else ''}
+
+Requirements:
+- Import statements
+- App initialization
+- Basic configuration
+
+Code:
+```python
+"""
+
+
+def _prompt_backend_routes(chunk: CodeChunk) -> str:
+    return f"""Write API routes/endpoints.
+File: {chunk.filename}
+{f'Context: {chunk.context[:300]}' if chunk.context else ''}
+
+Requirements:
+- Route handlers
+- Request/response handling
+- Error handling
+
+Code:
+```python
+"""
+
+
+def _prompt_database_schema(chunk: CodeChunk) -> str:
+    return f"""Write database schema/models.
+File: {chunk.filename}
+
+Requirements:
+- SQLite/SQLAlchemy models
+- Table definitions
+- Relationships
+
+Code:
+```python
+"""
+
+
+def _prompt_database_init(chunk: CodeChunk) -> str:
+    return f"""Write database initialization.
+File: {chunk.filename}
+{f'Context: {chunk.context[:200]}' if chunk.context else ''}
+
+Requirements:
+- Create tables
+- Initialize database
+
+Code:
+```python
+"""
+
+
+def _prompt_frontend_html(chunk: CodeChunk) -> str:
+    return f"""Write HTML template.
+File: {chunk.filename}
+{f'Context: {chunk.context[:200]}' if chunk.context else ''}
+
+Requirements:
+- Semantic HTML5
+- Form elements
+- Script/style links
+
+Code:
+```html
+"""
+
+
+def _prompt_frontend_css(chunk: CodeChunk) -> str:
+    return f"""Write CSS styles.
+File: {chunk.filename}
+
+Requirements:
+- Modern CSS
+- Responsive design
+- Clean layout
+
+Code:
+```css
+"""
+
+
+def _prompt_frontend_js(chunk: CodeChunk) -> str:
+    return f"""Write JavaScript client code.
+File: {chunk.filename}
+{f'Context: {chunk.context[:200]}' if chunk.context else ''}
+
+Requirements:
+- Event handlers
+- API calls (fetch)
+- DOM manipulation
+
+Code:
+```javascript
+"""
+
+
+def _prompt_readme(chunk: CodeChunk) -> str:
+    return f"""Write README.md documentation.
+Files created: {chunk.context if chunk.context else 'app files'}
+
+Requirements:
+- Project description
+- Setup instructions
+- Usage examples
+
+Code:
+```markdown
+"""
+
+
+def _prompt_single_file(chunk: CodeChunk) -> str:
+    return f"""Write the code.
+File: {chunk.filename}
+
+Code:
+```python
+"""
+
+
+# Chunk-specific prompt text by type. Builders run on demand so only the
+# prompt actually needed is formatted; see _build_chunk_prompt.
+_PROMPT_BUILDERS: Dict[ChunkType, Callable[[CodeChunk], str]] = {
+    ChunkType.BACKEND_SETUP: _prompt_backend_setup,
+    ChunkType.BACKEND_ROUTES: _prompt_backend_routes,
+    ChunkType.DATABASE_SCHEMA: _prompt_database_schema,
+    ChunkType.DATABASE_INIT: _prompt_database_init,
+    ChunkType.FRONTEND_HTML: _prompt_frontend_html,
+    ChunkType.FRONTEND_CSS: _prompt_frontend_css,
+    ChunkType.FRONTEND_JS: _prompt_frontend_js,
+    ChunkType.README: _prompt_readme,
+    ChunkType.SINGLE_FILE: _prompt_single_file,
+}
 
 
 class ProgressCallback:
@@ -133,6 +333,12 @@ class ChunkedTaskExecutor:
     # Estimated generation time per token (seconds) on CPU
     TOKENS_PER_SECOND_CPU = 5.0
 
+    # Weight of the latest chunk in the observed tokens/sec average
+    SPEED_SMOOTHING = 0.3
+
+    # Upper bound on chunks generated at once by coders that support it
+    MAX_PARALLEL_CHUNKS = 3
+
     def __init__(self, coder_model=None, file_tools=None):
         """Initialize chunked executor
 
@@ -144,6 +350,11 @@ class ChunkedTaskExecutor:
         self.file_tools = file_tools
         self.progress_callback = ConsoleProgressCallback()
         self._current_plan: Optional[ChunkedPlan] = None
+        # Starts at the CPU default, then tracks observed generation speed
+        self.tokens_per_second = self.TOKENS_PER_SECOND_CPU
+        self._progress_lock = threading.Lock()
+        self._write_queue: Queue = Queue()
+        self._writer: Optional[threading.Thread] = None
 
     def set_coder(self, coder_model):
         """Set or update the coder model"""
@@ -165,27 +376,19 @@ class ChunkedTaskExecutor:
         chunks = []
         task_lower = task_description.lower()
 
-        # Detect full-stack app patterns
-        is_fullstack = any(kw in task_lower for kw in [
-            'full-stack', 'fullstack', 'full stack',
-            'frontend and backend', 'backend and frontend',
-            'web app', 'web application'
-        ])
+        # Detect app patterns from the task's words in a single pass
+        words = set(_TASK_WORD_RE.findall(task_lower))
+
+        is_fullstack = (not _FULLSTACK_KW.isdisjoint(words)
+                        or any(p in task_lower for p in _FULLSTACK_PHRASES))
 
-        is_backend = any(kw in task_lower for kw in [
-            'flask', 'fastapi', 'django', 'backend', 'api', 'server',
-            'rest api', 'restful'
-        ])
+        is_backend = not _BACKEND_KW.isdisjoint(words)
 
-        is_frontend = any(kw in task_lower for kw in [
-            'html', 'frontend', 'react', 'vue', 'angular', 'webpage',
-            'website', 'ui', 'user interface'
-        ])
+        is_frontend = (not _FRONTEND_KW.isdisjoint(words)
+                       or any(p in task_lower for p in _FRONTEND_PHRASES))
 
-        has_database = any(kw in task_lower for kw in [
-            'database', 'sqlite', 'postgres', 'mysql', 'db', 'sql',
-            'crud', 'data storage', 'persistence'
-        ])
+        has_database = (not _DATABASE_KW.isdisjoint(words)
+                        or any(p in task_lower for p in _DATABASE_PHRASES))
 
         # Generate chunks based on detected patterns
         if is_fullstack or (is_backend and is_frontend):
@@ -196,20 +399,29 @@ class ChunkedTaskExecutor:
             chunks = self._plan_frontend_app(task_description)
         else:
             # Single file or simple task
-            chunks = self._plan_single_file(task_description)
+            chunks = self._plan_single_file(task_description, task_lower)
 
         # Calculate execution order respecting dependencies
-        execution_order = self._topological_sort(chunks)
+        dependents = self._dependents_map(chunks)
+        plan_error = None
+        try:
+            execution_order = self._topological_sort(chunks, dependents)
+        except ValueError as e:
+            # Nothing in a cyclic plan can be scheduled safely
+            execution_order = []
+            plan_error = str(e)
 
         # Estimate total time
         total_tokens = sum(c.max_tokens for c in chunks)
-        estimated_time = total_tokens / self.TOKENS_PER_SECOND_CPU
+        estimated_time = total_tokens / self.tokens_per_second
 
         plan = ChunkedPlan(
             task_description=task_description,
             chunks=chunks,
             execution_order=execution_order,
             estimated_total_time=estimated_time,
+            dependents=dependents,
+            chunk_map={c.chunk_id: c for c in chunks},
             metadata={
                 'is_fullstack': is_fullstack,
                 'is_backend': is_backend,
@@ -219,6 +431,8 @@ class ChunkedTaskExecutor:
                 'total_tokens': total_tokens
             }
         )
+        if plan_error:
+            plan.metadata['error'] = plan_error
 
         self._current_plan = plan
         return plan
@@ -246,7 +460,8 @@ class ChunkedTaskExecutor:
             description="Backend app initialization",
             filename="app.py",
             max_tokens=self.TOKEN_BUDGETS[ChunkType.BACKEND_SETUP],
-            dependencies=backend_deps
+            dependencies=backend_deps,
+            fuse_group="setup"
         ))
 
         # 3. Backend routes - depends on backend_setup
@@ -267,7 +482,8 @@ class ChunkedTaskExecutor:
                 description="Database initialization script",
                 filename="init_db.py",
                 max_tokens=self.TOKEN_BUDGETS[ChunkType.DATABASE_INIT],
-                dependencies=["db_schema"]
+                dependencies=["db_schema"],
+                fuse_group="setup"  # Small, and ready together with backend_setup
             ))
 
         # 5. Frontend HTML - can start after backend_setup is known
@@ -382,10 +598,10 @@ class ChunkedTaskExecutor:
 
         return chunks
 
-    def _plan_single_file(self, task: str) -> List[CodeChunk]:
+    def _plan_single_file(self, task: str, task_lower: Optional[str] = None) -> List[CodeChunk]:
         """Plan for single file generation"""
         # Infer filename and language
-        filename = self._infer_filename(task)
+        filename = self._infer_filename(task, task_lower)
 
         return [CodeChunk(
             chunk_id="main",
@@ -396,47 +612,60 @@ class ChunkedTaskExecutor:
             dependencies=[]
         )]
 
-    def _infer_filename(self, task: str) -> str:
-        """Infer output filename from task description"""
-        task_lower = task.lower()
+    def _infer_filename(self, task: str, task_lower: Optional[str] = None) -> str:
+        """Infer output filename from task description
+
+        Args:
+            task: Task description
+            task_lower: task.lower(), if the caller already has it
+        """
+        if task_lower is None:
+            task_lower = task.lower()
 
         # Check for explicit filename
-        import re
-        match = re.search(r'([a-zA-Z0-9_.-]+\.[a-zA-Z0-9]+)', task)
+        match = _FILENAME_RE.search(task)
         if match:
             return match.group(1)
 
-        # Infer from keywords
-        if 'calculator' in task_lower:
-            return 'calculator.py'
-        elif 'game' in task_lower:
-            return 'game.py'
-        elif 'server' in task_lower or 'api' in task_lower:
-            return 'app.py'
-        elif 'test' in task_lower:
-            return 'test_main.py'
+        # Infer from keywords, found in one scan and ranked by priority
+        found = set(_FILENAME_KEYWORD_RE.findall(task_lower))
+        if found:
+            for keyword, filename in _FILENAME_KEYWORDS.items():
+                if keyword in found:
+                    return filename
 
         return 'main.py'
 
-    def _topological_sort(self, chunks: List[CodeChunk]) -> List[str]:
-        """Sort chunks respecting dependencies"""
-        # Build adjacency and in-degree maps
-        in_degree = {c.chunk_id: 0 for c in chunks}
+    def _dependents_map(self, chunks: List[CodeChunk]) -> Dict[str, List[str]]:
+        """Map each chunk_id to the chunk_ids that depend on it"""
         dependents = {c.chunk_id: [] for c in chunks}
-        chunk_map = {c.chunk_id: c for c in chunks}
-
         for chunk in chunks:
             for dep in chunk.dependencies:
                 if dep in dependents:
                     dependents[dep].append(chunk.chunk_id)
-                    in_degree[chunk.chunk_id] += 1
+        return dependents
+
+    def _topological_sort(self, chunks: List[CodeChunk],
+                          dependents: Optional[Dict[str, List[str]]] = None) -> List[str]:
+        """Sort chunks respecting dependencies
+
+        Raises:
+            ValueError: If the dependencies contain a cycle
+        """
+        # Build adjacency and in-degree maps
+        if dependents is None:
+            dependents = self._dependents_map(chunks)
+        in_degree = {c.chunk_id: 0 for c in chunks}
+        for targets in dependents.values():
+            for cid in targets:
+                in_degree[cid] += 1
 
         # Kahn's algorithm
-        queue = [cid for cid, deg in in_degree.items() if deg == 0]
+        queue = deque(cid for cid, deg in in_degree.items() if deg == 0)
         result = []
 
         while queue:
-            current = queue.pop(0)
+            current = queue.popleft()
             result.append(current)
 
             for dependent in dependents[current]:
@@ -444,14 +673,33 @@ class ChunkedTaskExecutor:
                 if in_degree[dependent] == 0:
                     queue.append(dependent)
 
+        if len(result) != len(in_degree):
+            cyclic = sorted(set(in_degree) - set(result))
+            raise ValueError(f"Dependency cycle detected among chunks: {', '.join(cyclic)}")
+
         return result
 
-    def execute_plan(self, plan: ChunkedPlan, context: str = "") -> Dict[str, Any]:
+    def execute_plan(self, plan: ChunkedPlan, context: str = "",
+                     max_workers: Optional[int] = None,
+                     checkpoint_dir: Optional[Path] = None) -> Dict[str, Any]:
         """Execute a chunked plan
 
+        Chunks run as soon as their dependencies complete. When the coder
+        sets ``supports_concurrent`` (e.g. a remote backend), independent
+        chunks are generated in parallel on a thread pool; otherwise they
+        run one at a time in execution order. Ready chunks that share a
+        ``fuse_group`` are generated together in a single call.
+
+        With a checkpoint_dir, each completed chunk is saved there as it
+        finishes, and chunks already checkpointed for the same task are
+        restored instead of generated again, so an interrupted plan can
+        be resumed.
+
         Args:
             plan: ChunkedPlan to execute
             context: Additional context for generation
+            max_workers: Parallel generations (default: MAX_PARALLEL_CHUNKS)
+            checkpoint_dir: Directory for per-chunk checkpoints (optional)
 
         Returns:
             Dict with results and generated files
@@ -462,12 +710,23 @@ class ChunkedTaskExecutor:
                 'error': 'Coder model not set. Call set_coder() first.'
             }
 
+        if plan.metadata.get('error'):
+            return {'success': False, 'error': plan.metadata['error']}
+
         results = {}
         generated_files = {}
         failed_chunks = []
         completed_chunks = []
 
-        chunk_map = {c.chunk_id: c for c in plan.chunks}
+        chunk_map = plan.chunk_map or {c.chunk_id: c for c in plan.chunks}
+        dependents = plan.dependents or self._dependents_map(plan.chunks)
+        skipped = set()
+        restored = set()
+
+        if checkpoint_dir:
+            checkpoint_dir = Path(checkpoint_dir)
+            checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            task_hash = hashlib.sha1(plan.task_description.encode()).hexdigest()
         total = len(plan.execution_order)
 
         print(f"\n📋 Executing chunked plan: {total} chunks")
@@ -475,71 +734,161 @@ class ChunkedTaskExecutor:
         print(f"   Total tokens: {plan.metadata.get('total_tokens', 0)}")
         print("-" * 50)
 
-        for idx, chunk_id in enumerate(plan.execution_order, 1):
-            chunk = chunk_map[chunk_id]
-
-            # Check if dependencies are satisfied
-            deps_satisfied = all(
+        def deps_done(chunk: CodeChunk) -> bool:
+            return all(
                 chunk_map[dep].status == "completed"
                 for dep in chunk.dependencies
                 if dep in chunk_map
             )
 
-            if not deps_satisfied:
-                chunk.status = "skipped"
-                chunk.error = "Dependencies not satisfied"
-                failed_chunks.append(chunk_id)
-                continue
+        def skip(chunk: CodeChunk):
+            chunk.status = "skipped"
+            chunk.error = "Dependencies not satisfied"
+            failed_chunks.append(chunk.chunk_id)
+            skipped.add(chunk.chunk_id)
+
+        def skip_dependents(chunk_id: str):
+            """Skip everything downstream of a chunk that did not complete"""
+            queue = deque(dependents.get(chunk_id, ()))
+            while queue:
+                cid = queue.popleft()
+                if cid not in skipped:
+                    skip(chunk_map[cid])
+                    queue.extend(dependents.get(cid, ()))
+
+        def ready(chunk: CodeChunk) -> bool:
+            """Prepare a chunk to run, or mark it skipped if a dependency failed"""
+            if not deps_done(chunk):
+                skip(chunk)
+                skip_dependents(chunk.chunk_id)
+                return False
 
             # Build context from completed chunks
-            chunk_context = context
-            for dep_id in chunk.dependencies:
-                if dep_id in chunk_map and chunk_map[dep_id].result:
-                    chunk_context += f"\n\n# From {chunk_map[dep_id].filename}:\n"
-                    chunk_context += chunk_map[dep_id].result[:500]  # First 500 chars
-
-            chunk.context = chunk_context
+            chunk.context = context + "".join(
+                chunk_map[dep_id].context_snippet
+                for dep_id in chunk.dependencies
+                if dep_id in chunk_map
+            )
             chunk.status = "in_progress"
+            return True
+
+        def restore(chunk: CodeChunk) -> bool:
+            """Complete a chunk from its checkpoint, if there is one"""
+            if not checkpoint_dir:
+                return False
+            code = self._load_checkpoint(checkpoint_dir, chunk, task_hash)
+            if code is None:
+                return False
+            chunk.status = "completed"
+            chunk.result = code
+            chunk.context_snippet = f"\n\n# From {chunk.filename}:\n{code[:500]}"
+            restored.add(chunk.chunk_id)
+            record(chunk)
+            return True
+
+        def take_batch(chunk: CodeChunk, candidates: deque) -> List[CodeChunk]:
+            """Pull ready chunks from chunk's fuse group out of candidates"""
+            batch = [chunk]
+            if chunk.fuse_group:
+                for cid in list(candidates):
+                    other = chunk_map[cid]
+                    if other.fuse_group == chunk.fuse_group and deps_done(other):
+                        candidates.remove(cid)
+                        ready(other)
+                        batch.append(other)
+            return batch
+
+        def record(chunk: CodeChunk):
+            """Collect a finished chunk's outcome"""
+            if chunk.status == "completed":
+                generated_files[chunk.filename] = chunk.result
+                completed_chunks.append(chunk.chunk_id)
+
+                # Save file if file_tools available
+                if self.file_tools:
+                    self._save_chunk_file(chunk)
+                if checkpoint_dir and chunk.chunk_id not in restored:
+                    self._save_checkpoint(checkpoint_dir, chunk, task_hash)
+
+                # Calibrate speed and refine the plan's estimate as we go
+                if chunk.generation_time > 0 and chunk.chunk_id not in restored:
+                    self._observe_speed(chunk)
+                    plan.estimated_total_time = (
+                        sum(c.generation_time for c in plan.chunks) + self.get_eta(plan))
+            else:
+                failed_chunks.append(chunk.chunk_id)
+                skip_dependents(chunk.chunk_id)
 
-            # Notify progress
-            self.progress_callback.on_chunk_start(chunk, idx, total)
-
-            # Generate code for this chunk
-            start_time = time.time()
-            try:
-                result = self._generate_chunk(chunk, plan.task_description)
-                chunk.generation_time = time.time() - start_time
-
-                if result['success']:
-                    chunk.status = "completed"
-                    chunk.result = result['code']
-                    generated_files[chunk.filename] = result['code']
-                    completed_chunks.append(chunk_id)
-                    self.progress_callback.on_chunk_complete(chunk, idx, total)
-
-                    # Save file if file_tools available
-                    if self.file_tools:
-                        self._save_chunk_file(chunk)
-                else:
-                    chunk.status = "failed"
-                    chunk.error = result.get('error', 'Unknown error')
-                    failed_chunks.append(chunk_id)
-                    self.progress_callback.on_chunk_error(chunk, chunk.error)
-
-            except Exception as e:
-                chunk.generation_time = time.time() - start_time
-                chunk.status = "failed"
-                chunk.error = str(e)
-                failed_chunks.append(chunk_id)
-                self.progress_callback.on_chunk_error(chunk, str(e))
-
-            results[chunk_id] = {
+            results[chunk.chunk_id] = {
                 'status': chunk.status,
                 'filename': chunk.filename,
                 'generation_time': chunk.generation_time,
                 'error': chunk.error
             }
 
+        workers = max_workers or self.MAX_PARALLEL_CHUNKS
+        if workers > 1 and getattr(self.coder, 'supports_concurrent', False):
+            # Kahn's algorithm again, but every chunk whose dependencies
+            # have finished is handed to the pool instead of waiting its turn
+            in_degree = {cid: 0 for cid in plan.execution_order}
+            for cid in plan.execution_order:
+                for dependent in dependents.get(cid, ()):
+                    if dependent in in_degree:
+                        in_degree[dependent] += 1
+
+            queue = deque(cid for cid in plan.execution_order if in_degree[cid] == 0)
+
+            def release(chunk: CodeChunk):
+                for dependent in dependents.get(chunk.chunk_id, ()):
+                    if dependent in in_degree:
+                        in_degree[dependent] -= 1
+                        if in_degree[dependent] == 0 and dependent not in skipped:
+                            queue.append(dependent)
+
+            running = {}
+            idx = 0
+
+            with ThreadPoolExecutor(max_workers=workers,
+                                    thread_name_prefix='codey-chunk') as pool:
+                while queue or running:
+                    while queue:
+                        chunk = chunk_map[queue.popleft()]
+                        if ready(chunk):
+                            batch = []
+                            for member in take_batch(chunk, queue):
+                                if restore(member):
+                                    release(member)
+                                else:
+                                    batch.append(member)
+                            if batch:
+                                future = pool.submit(self._run_chunks, batch, idx + 1, total,
+                                                     plan.task_description)
+                                running[future] = batch
+                                idx += len(batch)
+
+                    if not running:
+                        break
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        for chunk in running.pop(future):
+                            record(chunk)
+                            release(chunk)
+        else:
+            pending = deque(plan.execution_order)
+            idx = 0
+            while pending:
+                chunk = chunk_map[pending.popleft()]
+                if chunk.chunk_id not in skipped and ready(chunk):
+                    batch = [c for c in take_batch(chunk, pending) if not restore(c)]
+                    if batch:
+                        self._run_chunks(batch, idx + 1, total, plan.task_description)
+                        idx += len(batch)
+                    for chunk in batch:
+                        record(chunk)
+
+        self.flush()
+
         # Summary
         success = len(failed_chunks) == 0
         total_time = sum(c.generation_time for c in plan.chunks)
@@ -560,6 +909,110 @@ class ChunkedTaskExecutor:
             'total_time': total_time
         }
 
+    def _observe_speed(self, chunk: CodeChunk):
+        """Fold a completed chunk's tokens/sec into the running average"""
+        observed = estimate_tokens(chunk.result) / chunk.generation_time
+        alpha = self.SPEED_SMOOTHING
+        self.tokens_per_second = alpha * observed + (1 - alpha) * self.tokens_per_second
+
+    def get_eta(self, plan: Optional[ChunkedPlan] = None) -> float:
+        """Estimate seconds left for a plan's unfinished chunks
+
+        Uses the observed generation speed, so the estimate improves as
+        chunks complete.
+
+        Args:
+            plan: Plan to estimate (default: the last analyzed plan)
+        """
+        plan = plan or self._current_plan
+        if not plan:
+            return 0.0
+        remaining = sum(c.max_tokens for c in plan.chunks
+                        if c.status in ("pending", "in_progress"))
+        return remaining / self.tokens_per_second
+
+    def _run_chunks(self, chunks: List[CodeChunk], index: int, total: int,
+                    task_description: str) -> None:
+        """Generate prepared chunks, updating their status in place
+
+        Several chunks are generated with one fused call; any the fused
+        response does not cover are generated on their own. May run on a
+        pool thread, so progress callbacks are serialized through
+        ``_progress_lock``.
+        """
+        with self._progress_lock:
+            for offset, chunk in enumerate(chunks):
+                self.progress_callback.on_chunk_start(chunk, index + offset, total)
+
+        fused = {}
+        if len(chunks) > 1:
+            start_time = time.time()
+            fused = self._generate_fused(chunks, task_description)
+            share = (time.time() - start_time) / len(chunks)
+            for chunk in chunks:
+                chunk.generation_time = share
+
+        for offset, chunk in enumerate(chunks):
+            if chunk.chunk_id in fused:
+                result = {'success': True, 'code': fused[chunk.chunk_id]}
+            else:
+                start_time = time.time()
+                result = self._generate_chunk(chunk, task_description)
+                chunk.generation_time += time.time() - start_time
+
+            with self._progress_lock:
+                if result['success']:
+                    chunk.status = "completed"
+                    chunk.result = result['code']
+                    chunk.context_snippet = f"\n\n# From {chunk.filename}:\n{chunk.result[:500]}"
+                    self.progress_callback.on_chunk_complete(chunk, index + offset, total)
+                else:
+                    chunk.status = "failed"
+                    chunk.error = result.get('error', 'Unknown error')
+                    self.progress_callback.on_chunk_error(chunk, chunk.error)
+
+    def _generate_fused(self, chunks: List[CodeChunk], task_description: str) -> Dict[str, str]:
+        """Generate several small chunks with a single prompt
+
+        The model is asked for ``--- FILE: <name> ---`` delimited output,
+        which saves re-reading the shared task and context once per chunk.
+
+        Returns:
+            Dict mapping chunk_id to code for each file found in the response
+        """
+        context = chunks[0].context
+        files = "".join(f"- {c.filename}: {c.description}\n" for c in chunks)
+        prompt = self._task_prefix(task_description) + f"""Write these files.
+{f'Context: {context[:300]}' if context else ''}
+
+Files:
+{files}
+Start each file with a line "--- FILE: <name> ---" followed by its code.
+
+--- FILE: {chunks[0].filename} ---
+"""
+        try:
+            response = self.coder.generate(
+                prompt,
+                max_tokens=sum(c.max_tokens for c in chunks),
+                temperature=0.3,
+                stop=["</s>", "User:", "Human:", "<|im_end|>"]
+            )
+        except Exception:
+            return {}
+
+        # Split into [preamble, name, body, name, body, ...]
+        parts = _FILE_MARKER_RE.split(f"--- FILE: {chunks[0].filename} ---\n{response}")
+        sections = dict(zip(parts[1::2], parts[2::2]))
+
+        fused = {}
+        for chunk in chunks:
+            body = sections.get(chunk.filename)
+            code = self._extract_code(body, chunk) if body else None
+            if code:
+                fused[chunk.chunk_id] = code
+        return fused
+
     def _generate_chunk(self, chunk: CodeChunk, task_description: str) -> Dict[str, Any]:
         """Generate code for a single chunk
 
@@ -594,130 +1047,30 @@ class ChunkedTaskExecutor:
             return {'success': False, 'error': str(e)}
 
     def _build_chunk_prompt(self, chunk: CodeChunk, task_description: str) -> str:
-        """Build prompt for a specific chunk"""
-        prompts = {
-            ChunkType.BACKEND_SETUP: f"""Write Python Flask/FastAPI app initialization.
-Task: {task_description}
-File: {chunk.filename}
-{f'Context: {chunk.context[:300]}' if chunk.context else ''}
+        """Build prompt for a specific chunk
 
-Requirements:
-- Import statements
-- App initialization
-- Basic configuration
-
-Code:
-```python
-""",
-            ChunkType.BACKEND_ROUTES: f"""Write API routes/endpoints.
-Task: {task_description}
-File: {chunk.filename}
-{f'Context: {chunk.context[:300]}' if chunk.context else ''}
-
-Requirements:
-- Route handlers
-- Request/response handling
-- Error handling
-
-Code:
-```python
-""",
-            ChunkType.DATABASE_SCHEMA: f"""Write database schema/models.
-Task: {task_description}
-File: {chunk.filename}
-
-Requirements:
-- SQLite/SQLAlchemy models
-- Table definitions
-- Relationships
-
-Code:
-```python
-""",
-            ChunkType.DATABASE_INIT: f"""Write database initialization.
-Task: {task_description}
-File: {chunk.filename}
-{f'Context: {chunk.context[:200]}' if chunk.context else ''}
-
-Requirements:
-- Create tables
-- Initialize database
-
-Code:
-```python
-""",
-            ChunkType.FRONTEND_HTML: f"""Write HTML template.
-Task: {task_description}
-File: {chunk.filename}
-{f'Context: {chunk.context[:200]}' if chunk.context else ''}
-
-Requirements:
-- Semantic HTML5
-- Form elements
-- Script/style links
-
-Code:
-```html
-""",
-            ChunkType.FRONTEND_CSS: f"""Write CSS styles.
-Task: {task_description}
-File: {chunk.filename}
-
-Requirements:
-- Modern CSS
-- Responsive design
-- Clean layout
-
-Code:
-```css
-""",
-            ChunkType.FRONTEND_JS: f"""Write JavaScript client code.
-Task: {task_description}
-File: {chunk.filename}
-{f'Context: {chunk.context[:200]}' if chunk.context else ''}
-
-Requirements:
-- Event handlers
-- API calls (fetch)
-- DOM manipulation
-
-Code:
-```javascript
-""",
-            ChunkType.README: f"""Write README.md documentation.
-Task: {task_description}
-Files created: {chunk.context if chunk.context else 'app files'}
-
-Requirements:
-- Project description
-- Setup instructions
-- Usage examples
-
-Code:
-```markdown
-""",
-            ChunkType.SINGLE_FILE: f"""Write code: {task_description}
-File: {chunk.filename}
+        Every prompt starts with the same task prefix (see _task_prefix)
+        so llama.cpp can reuse its KV cache from the previous chunk.
+        """
+        build = _PROMPT_BUILDERS.get(chunk.chunk_type, _prompt_single_file)
+        return self._task_prefix(task_description) + build(chunk)
 
-Code:
-```python
-""",
-        }
+    def _task_prefix(self, task_description: str) -> str:
+        """Opening shared by every prompt of a plan
 
-        return prompts.get(chunk.chunk_type, prompts[ChunkType.SINGLE_FILE])
+        llama.cpp keeps the evaluated tokens of the previous prompt and
+        only re-processes what follows the longest common prefix, so
+        putting the stable task text first lets each chunk after the
+        first skip its prefill. Backends without a prefix cache just see
+        the same prompt text reordered.
+        """
+        return f"Task: {task_description}\n\n"
 
     def _extract_code(self, response: str, chunk: CodeChunk) -> Optional[str]:
         """Extract code from model response"""
-        import re
-
-        # Try to extract code block
-        patterns = [
-            r'```\w*\n(.*?)```',  # Standard code block
-            r'```\w*\n(.*?)$',     # Unclosed code block
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, response, re.DOTALL)
+        # Try to extract code block, standard first, then unclosed
+        for pattern in (_CODE_BLOCK_RE, _CODE_BLOCK_OPEN_RE):
+            match = pattern.search(response)
             if match:
                 return match.group(1).strip()
 
@@ -728,26 +1081,77 @@ Code:
         return None
 
     def _save_chunk_file(self, chunk: CodeChunk) -> bool:
-        """Save generated chunk to file"""
+        """Queue a generated chunk to be saved to file
+
+        Files are written by a single background thread so the next chunk
+        does not wait on disk I/O; flush() waits for pending writes.
+
+        Returns:
+            True if the file was queued
+        """
         if not self.file_tools or not chunk.result:
             return False
 
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._writer_loop,
+                                            name='codey-chunk-writer', daemon=True)
+            self._writer.start()
+        self._write_queue.put((chunk.filename, chunk.result))
+        return True
+
+    def _writer_loop(self):
+        """Write queued (filename, content) pairs until a None sentinel"""
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    return
+                filename, content = item
+                try:
+                    # file_tools.write_file creates parent directories
+                    self.file_tools.write_file(filename, content, overwrite=True)
+                except Exception as e:
+                    print(f"   ⚠️  Failed to save {filename}: {e}")
+            finally:
+                self._write_queue.task_done()
+
+    def flush(self):
+        """Wait until every queued chunk file has been written"""
+        writer = self._writer
+        if writer is None:
+            return
+        self._write_queue.put(None)
+        writer.join()
+        self._writer = None
+
+    def _load_checkpoint(self, checkpoint_dir: Path, chunk: CodeChunk,
+                         task_hash: str) -> Optional[str]:
+        """Return a chunk's checkpointed code if it belongs to this task"""
         try:
-            # Create parent directories if needed
-            filepath = Path(chunk.filename)
-            if filepath.parent != Path('.'):
-                # Use shell to create directories
-                pass  # file_tools.write_file handles this
-
-            result = self.file_tools.write_file(
-                chunk.filename,
-                chunk.result,
-                overwrite=True
-            )
-            return result.get('success', False)
-        except Exception as e:
-            print(f"   ⚠️  Failed to save {chunk.filename}: {e}")
-            return False
+            with open(checkpoint_dir / f"{chunk.chunk_id}.json", encoding='utf-8') as f:
+                entry = json.load(f)
+            if entry['chunk_id'] == chunk.chunk_id and entry['hash'] == task_hash:
+                return entry['result'] or None
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _save_checkpoint(self, checkpoint_dir: Path, chunk: CodeChunk, task_hash: str):
+        """Write a completed chunk's checkpoint atomically"""
+        path = checkpoint_dir / f"{chunk.chunk_id}.json"
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'chunk_id': chunk.chunk_id,
+                    'filename': chunk.filename,
+                    'result': chunk.result,
+                    'hash': task_hash
+                }, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # Losing a checkpoint only means regenerating the chunk on resume
+            print(f"   ⚠️  Failed to checkpoint {chunk.chunk_id}: {e}")
 
     def get_plan_summary(self, plan: ChunkedPlan) -> str:
         """Get human-readable summary of a plan"""
@@ -760,11 +1164,15 @@ Code:
             "   Execution order:"
         ]
 
+        chunk_map = plan.chunk_map or {c.chunk_id: c for c in plan.chunks}
         for i, chunk_id in enumerate(plan.execution_order, 1):
-            chunk = next(c for c in plan.chunks if c.chunk_id == chunk_id)
+            chunk = chunk_map[chunk_id]
             deps = f" (depends on: {', '.join(chunk.dependencies)})" if chunk.dependencies else ""
             lines.append(f"   {i}. [{chunk.chunk_type.value}] {chunk.filename}{deps}")
 
+        if plan.metadata.get('error'):
+            lines.append(f"   ⚠️  {plan.metadata['error']}")
+
         return "\n".join(lines)
 
 
@@ -779,5 +1187,6 @@ def estimate_generation_time(task_description: str, tokens_per_second: float = 5
         Estimated time in seconds
     """
     executor = ChunkedTaskExecutor()
+    executor.tokens_per_second = tokens_per_second
     plan = executor.analyze_task(task_description)
     return plan.estimated_total_time
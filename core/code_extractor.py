@@ -9,16 +9,103 @@ This module handles:
 
 Part of Phase 6.1: Code Extraction Fixes
 """
+import os
 import re
-from typing import Optional, Tuple, List
-from pathlib import Path
+from typing import Optional, Tuple, List, Dict, Iterable
+
+
+def _compile_all(patterns: Iterable[str], flags: int = 0) -> List['re.Pattern']:
+    """Compile a list of regex strings once, at import time"""
+    return [re.compile(p, flags) for p in patterns]
+
+
+def _compile_table(table: Dict[str, List[str]], flags: int = 0) -> Dict[str, List['re.Pattern']]:
+    """Compile every pattern list in a per-extension table"""
+    return {ext: _compile_all(patterns, flags) for ext, patterns in table.items()}
+
+
+def _compile_indicators(table: Dict[str, List[str]]) -> Dict[str, list]:
+    """Compile the ^-anchored entries of an indicator table; keep substrings"""
+    return {
+        ext: [re.compile(i, re.MULTILINE) if i.startswith('^') else i for i in indicators]
+        for ext, indicators in table.items()
+    }
+
+
+# Code block shapes tried by _extract_from_code_blocks
+_FENCED_BLOCK_PATTERNS = tuple(_compile_all([
+    # Standard code block with language (capture content only)
+    r'```(?:python|py|html|css|javascript|js|json|markdown|md|txt|sql)?\s*\n(.*?)```',
+    # Code block without language
+    r'```\n(.*?)```',
+    # Filename followed by code block (common LLM pattern)
+    r'[a-zA-Z_/][a-zA-Z0-9_/]*\.(?:py|html|css|js)\s*\n```(?:python|py|html|css|javascript|js)?\s*\n(.*?)```',
+], re.DOTALL | re.IGNORECASE))
+# FILE: marker (any case)
+_FILE_MARKER_BLOCK_RE = re.compile(r'#\s*FILE:\s*[^\n]+\n(.*?)(?:```|$)', re.DOTALL | re.IGNORECASE)
+_CODE_BLOCK_PATTERNS = _FENCED_BLOCK_PATTERNS + (_FILE_MARKER_BLOCK_RE,)
+
+# Lines that are just a filename or path (see _is_filename_line)
+_FILENAME_LINE_PATTERNS = tuple(_compile_all([
+    r'^[a-zA-Z_][a-zA-Z0-9_]*\.(py|html|css|js|json|md|txt)$',
+    r'^(templates|static)/[a-zA-Z_][a-zA-Z0-9_/]*\.(py|html|css|js)$',
+    r'^static/css/[a-zA-Z_][a-zA-Z0-9_]*\.css$',
+    r'^static/js/[a-zA-Z_][a-zA-Z0-9_]*\.js$',
+    r'^templates/[a-zA-Z_][a-zA-Z0-9_]*\.html$',
+    # Lines that are just "filename:" or "# filename"
+    r'^#?\s*[a-zA-Z_][a-zA-Z0-9_/]*\.(py|html|css|js):?\s*$',
+]))
+
+# _clean_code line matchers
+_FILE_MARKER_RE = re.compile(r'^#\s*(?:FILE|file):\s*\S+')
+_FILENAME_COMMENT_RE = re.compile(r'^\s*(?://|#)\s*[a-zA-Z_/]+\.(js|py|css|html)\s*$')
+
+# _try_salvage content finders
+_CSS_SELECTOR_START_RE = re.compile(r'[a-zA-Z#.*:@\[]')
+_CSS_SELECTOR_END_RE = re.compile(r'[{<>]')
+_JS_CODE_RE = re.compile(r'((?:function|const|let|var|document\.)[^<]+)', re.DOTALL)
+
+
+def _file_ext(filename: str) -> str:
+    """Lowercased extension of filename, without building a Path"""
+    return os.path.splitext(filename)[1].lower()
+
+
+def _iter_css_rules(text: str):
+    """Yield (selector, properties) for each "selector { props }" in text
+
+    A selector starts with a letter or one of #.*:@[ and runs up to the
+    next '{' (no '<' or '>'); the properties run to the next '}'. A regex
+    for this retries from every start character and rescans the rest of
+    the text each time, which is quadratic on long responses with no
+    closing brace. Every start before the same '{', '<' or '>' shares
+    one outcome, so here a failed attempt skips past it in one step.
+    """
+    pos = 0
+    while True:
+        start = _CSS_SELECTOR_START_RE.search(text, pos)
+        if not start:
+            return
+        end = _CSS_SELECTOR_END_RE.search(text, start.start())
+        if not end:
+            return
+        brace = end.start()
+        if text[brace] == '{':
+            close = text.find('}', brace + 1)
+            if close == -1:
+                return
+            if close > brace + 1:
+                yield text[start.start():brace], text[brace + 1:close]
+                pos = close + 1
+                continue
+        pos = brace + 1
 
 
 class CodeExtractor:
     """Robust code extraction from LLM responses"""
 
-    # File type to expected content patterns
-    FILE_TYPE_PATTERNS = {
+    # File type to expected content patterns (compiled with re.MULTILINE)
+    FILE_TYPE_PATTERNS = _compile_table({
         '.py': [
             r'^\s*(import |from |def |class |@|#|if __name__|""")',
             r'^\s*[a-zA-Z_][a-zA-Z0-9_]*\s*=',  # Variable assignment
@@ -44,15 +131,16 @@ class CodeExtractor:
         '.txt': [
             r'.',  # Any content
         ],
-    }
+    }, re.MULTILINE)
 
-    # Patterns that indicate wrong content type
-    WRONG_TYPE_INDICATORS = {
+    # Patterns that indicate wrong content type: plain substrings, or
+    # line-anchored regexes (written with a leading ^, compiled MULTILINE)
+    WRONG_TYPE_INDICATORS = _compile_indicators({
         '.css': ['<!DOCTYPE', '<html', '<head', '<body', 'function ', 'const ', 'import '],
         '.js': ['<!DOCTYPE', '<html', '<head', '<body', 'body {', '.class {', '@media'],
         '.py': ['<!DOCTYPE', '<html', 'function ', 'const ', 'body {'],
         '.html': ['^body {', '^\.', '^#[a-z]'],  # CSS selectors at start
-    }
+    })
 
     def __init__(self):
         pass
@@ -70,7 +158,7 @@ class CodeExtractor:
         if not response or response.startswith("✗") or response.startswith("Error"):
             return None, "Empty or error response"
 
-        file_ext = Path(filename).suffix.lower()
+        file_ext = _file_ext(filename)
 
         # Step 1: Try to extract from code blocks
         code = self._extract_from_code_blocks(response, filename)
@@ -106,28 +194,27 @@ class CodeExtractor:
         # Pattern 3: filename\n```language\ncode\n```
         # Pattern 4: # FILE: filename\ncode
 
-        patterns = [
-            # Standard code block with language (capture content only)
-            r'```(?:python|py|html|css|javascript|js|json|markdown|md|txt|sql)?\s*\n(.*?)```',
-            # Code block without language
-            r'```\n(.*?)```',
-            # Filename followed by code block (common LLM pattern)
-            r'[a-zA-Z_/][a-zA-Z0-9_/]*\.(?:py|html|css|js)\s*\n```(?:python|py|html|css|javascript|js)?\s*\n(.*?)```',
-            # FILE: marker
-            r'#\s*FILE:\s*[^\n]+\n(.*?)(?:```|$)',
-            # file: marker (lowercase)
-            r'#\s*file:\s*[^\n]+\n(.*?)(?:```|$)',
-        ]
-
-        all_matches = []
+        # Every pattern but the FILE: marker needs a ``` fence, and that one
+        # needs a '#'; probe with plain substring checks before any regex
+        if '```' in response:
+            patterns = _CODE_BLOCK_PATTERNS
+        elif '#' in response:
+            patterns = (_FILE_MARKER_BLOCK_RE,)
+        else:
+            return None
+
+        # Keep the longest match (most complete code block) by its span,
+        # slicing out only the winner
+        best = None
+        best_len = -1
         for pattern in patterns:
-            matches = re.findall(pattern, response, re.DOTALL | re.IGNORECASE)
-            all_matches.extend(matches)
+            for match in pattern.finditer(response):
+                length = match.end(1) - match.start(1)
+                if length > best_len:
+                    best, best_len = match, length
 
-        if all_matches:
-            # Return the longest match (most complete code block)
-            best_match = max(all_matches, key=len)
-            return best_match.strip()
+        if best is not None:
+            return best.group(1).strip()
 
         return None
 
@@ -136,24 +223,23 @@ class CodeExtractor:
         # First, check for wrong type indicators - if found, try salvage
         wrong_indicators = self.WRONG_TYPE_INDICATORS.get(file_ext, [])
         for indicator in wrong_indicators:
-            if indicator.startswith('^'):
-                if re.search(indicator, response, re.MULTILINE):
-                    return self._try_salvage(response, file_ext)
-            else:
+            if isinstance(indicator, str):
                 if indicator in response:
                     return self._try_salvage(response, file_ext)
+            elif indicator.search(response):
+                return self._try_salvage(response, file_ext)
 
         # Check if response looks like the target file type
         patterns = self.FILE_TYPE_PATTERNS.get(file_ext, [])
 
         for pattern in patterns:
-            if re.search(pattern, response, re.MULTILINE):
+            if pattern.search(response):
                 return response.strip()
 
         return None
 
-    # Garbage patterns that leak from LLM context
-    GARBAGE_PATTERNS = [
+    # Garbage patterns that leak from LLM context (matched case-insensitively)
+    GARBAGE_PATTERNS = _compile_all([
         r'^leted\b',        # Fragment of "completed" (can have trailing content)
         r'^eted\b',         # Another fragment
         r'^pleted\b',       # Another fragment
@@ -179,75 +265,53 @@ class CodeExtractor:
         r'^#\s*static/',    # Python/CSS comment with static path
         r'^#\s*[a-zA-Z_]+\.(py|js|css|html)\s*$',   # Python comment that's just a filename
         r'^/\*\s*static/',  # CSS/JS block comment with static path
-    ]
+    ], re.IGNORECASE)
+
+    # All of the above as one alternation, so a line is tested in one call
+    _GARBAGE_RE = re.compile('|'.join(f'(?:{p.pattern})' for p in GARBAGE_PATTERNS), re.IGNORECASE)
 
     # Patterns that indicate end-of-file garbage (truncation/mixing)
-    END_GARBAGE_PATTERNS = [
+    END_GARBAGE_PATTERNS = _compile_all([
         r'^File:\s*\S+\.py',      # "File: something.py" at end
         r'^```\w*\s*$',           # Stray code fence
         r'^Code:\s*\S+\.(py|js|css|html)',  # "Code: filename"
         r'^\*\*\w+\*\*:',         # "**Something**:" markdown
         r'^---+\s*$',             # Horizontal rule
         r'^Step \d+:',            # Step markers
-    ]
+    ], re.IGNORECASE)
 
     def _clean_code(self, code: str, file_ext: str) -> str:
         """Clean extracted code of common artifacts"""
-        lines = code.split('\n')
         cleaned_lines = []
 
         # Track if we've found actual code yet
         found_code = False
 
-        for i, line in enumerate(lines):
+        for i, line in enumerate(code.split('\n')):
+            stripped = line.strip()
+
             # Skip filename-only lines at the start (first 5 lines)
-            if i < 5 and self._is_filename_line(line):
+            if i < 5 and self._is_filename_line(stripped):
                 continue
 
             # Skip markdown code block markers
-            if line.strip().startswith('```'):
+            if stripped.startswith('```'):
                 continue
 
             # Skip "# FILE:" or "# file:" markers
-            if re.match(r'^#\s*(?:FILE|file):\s*\S+', line):
-                continue
-
-            # Skip lines that are just the filename
-            if i < 5 and line.strip() in [
-                'app.py', 'index.html', 'style.css', 'script.js',
-                'app.js', 'main.py', 'requirements.txt', 'README.md',
-                'models.py', 'init_db.py', 'config.py', 'utils.py'
-            ]:
+            if _FILE_MARKER_RE.match(line):
                 continue
 
-            # Skip garbage patterns (only at start before real code found)
             if not found_code:
-                is_garbage = False
-                for pattern in self.GARBAGE_PATTERNS:
-                    if re.match(pattern, line, re.IGNORECASE):
-                        is_garbage = True
-                        break
-                if is_garbage:
+                # Skip garbage patterns (only at start before real code found)
+                if self._GARBAGE_RE.match(line):
                     continue
 
-            # Check if this line looks like actual code (not just a comment with filename)
-            if not found_code and line.strip():
-                # Skip comments that are just filenames (even though they look like code)
-                if re.match(r'^\s*//\s*[a-zA-Z_/]+\.(js|py|css|html)\s*$', line):
-                    continue
-                if re.match(r'^\s*#\s*[a-zA-Z_/]+\.(js|py|css|html)\s*$', line):
-                    continue
-
-                # For different file types, check if it's real code
-                if file_ext == '.py' and re.match(r'^\s*(from |import |def |class |@|#[^a-zA-Z_/]|"""|\'\'\' |[a-zA-Z_])', line):
-                    found_code = True
-                elif file_ext == '.css' and re.match(r'^\s*([a-zA-Z#.*:@\[]|/\*)', line):
-                    found_code = True
-                elif file_ext == '.js' and re.match(r'^\s*(//[^a-zA-Z_/]|/\*|document\.|window\.|const |let |var |function |class |import |export |async |\()', line):
-                    found_code = True
-                elif file_ext == '.html' and re.match(r'^\s*(<|<!)', line):
-                    found_code = True
-                elif line.strip():  # Any non-empty line for other types
+                # The first non-empty line is actual code, unless it is a
+                # comment that is just a filename
+                if stripped:
+                    if _FILENAME_COMMENT_RE.match(line):
+                        continue
                     found_code = True
 
             if found_code or (i > 4):  # After 5 lines, accept everything
@@ -257,12 +321,13 @@ class CodeExtractor:
         cleaned_lines = self._trim_end_garbage(cleaned_lines)
 
         # Remove leading/trailing empty lines
-        while cleaned_lines and not cleaned_lines[0].strip():
-            cleaned_lines.pop(0)
-        while cleaned_lines and not cleaned_lines[-1].strip():
-            cleaned_lines.pop()
+        start, end = 0, len(cleaned_lines)
+        while start < end and not cleaned_lines[start].strip():
+            start += 1
+        while end > start and not cleaned_lines[end - 1].strip():
+            end -= 1
 
-        return '\n'.join(cleaned_lines)
+        return '\n'.join(cleaned_lines[start:end])
 
     def _trim_end_garbage(self, lines: list) -> list:
         """Remove garbage from end of file (truncation/mixing artifacts)"""
@@ -276,7 +341,7 @@ class CodeExtractor:
             is_end_garbage = False
 
             for pattern in self.END_GARBAGE_PATTERNS:
-                if re.match(pattern, line, re.IGNORECASE):
+                if pattern.match(line):
                     is_end_garbage = True
                     break
 
@@ -292,42 +357,25 @@ class CodeExtractor:
         """Check if line is just a filename or path"""
         stripped = line.strip()
 
-        # Common file patterns
-        file_patterns = [
-            r'^[a-zA-Z_][a-zA-Z0-9_]*\.(py|html|css|js|json|md|txt)$',
-            r'^(templates|static)/[a-zA-Z_][a-zA-Z0-9_/]*\.(py|html|css|js)$',
-            r'^static/css/[a-zA-Z_][a-zA-Z0-9_]*\.css$',
-            r'^static/js/[a-zA-Z_][a-zA-Z0-9_]*\.js$',
-            r'^templates/[a-zA-Z_][a-zA-Z0-9_]*\.html$',
-        ]
-
-        for pattern in file_patterns:
-            if re.match(pattern, stripped):
-                return True
-
-        # Also check for lines that are just "filename:" or "# filename"
-        if re.match(r'^#?\s*[a-zA-Z_][a-zA-Z0-9_/]*\.(py|html|css|js):?\s*$', stripped):
-            return True
-
-        return False
+        # Common file patterns, plus "filename:" or "# filename"
+        return any(pattern.match(stripped) for pattern in _FILENAME_LINE_PATTERNS)
 
     def _validate_content_type(self, code: str, file_ext: str) -> Tuple[bool, str]:
         """Validate that code matches expected file type"""
         # Check for wrong type indicators
         wrong_indicators = self.WRONG_TYPE_INDICATORS.get(file_ext, [])
         for indicator in wrong_indicators:
-            if indicator.startswith('^'):
-                # Regex pattern
-                if re.search(indicator, code, re.MULTILINE):
-                    return False, f"Contains wrong content type pattern: {indicator}"
-            else:
+            if isinstance(indicator, str):
                 if indicator in code:
                     return False, f"Contains wrong content type: {indicator}"
+            elif indicator.search(code):
+                # Regex pattern
+                return False, f"Contains wrong content type pattern: {indicator.pattern}"
 
         # Check for expected type indicators
         expected_patterns = self.FILE_TYPE_PATTERNS.get(file_ext, [])
         for pattern in expected_patterns:
-            if re.search(pattern, code, re.MULTILINE):
+            if pattern.search(code):
                 return True, "Content matches expected type"
 
         # If no patterns matched but no wrong indicators, accept it
@@ -335,17 +383,14 @@ class CodeExtractor:
 
     def _try_salvage(self, response: str, file_ext: str) -> Optional[str]:
         """Try to find correct content in a misformatted response"""
-        # Look for content blocks that match the expected type
-        expected_patterns = self.FILE_TYPE_PATTERNS.get(file_ext, [])
-
         # For CSS, try to find CSS-only content
         if file_ext == '.css':
             # Find all CSS rule blocks
             css_rules = []
             # Match selector { properties }
-            for match in re.finditer(r'([a-zA-Z#.*:@\[][^{<>]*)\{([^}]+)\}', response, re.DOTALL):
-                selector = match.group(1).strip()
-                props = match.group(2).strip()
+            for selector, props in _iter_css_rules(response):
+                selector = selector.strip()
+                props = props.strip()
                 # Skip if selector looks like HTML or JS
                 if '<' in selector or '>' in selector or 'function' in selector:
                     continue
@@ -360,13 +405,17 @@ class CodeExtractor:
         # For JS, try to find JS-only content
         if file_ext == '.js':
             # Find function definitions or document ready
-            js_match = re.search(r'((?:function|const|let|var|document\.)[^<]+)', response, re.DOTALL)
+            js_match = _JS_CODE_RE.search(response)
             if js_match:
                 return js_match.group(1).strip()
 
         return None
 
 
+# CodeExtractor holds no per-call state, so the helpers below share one
+_EXTRACTOR = CodeExtractor()
+
+
 def extract_code(response: str, filename: str) -> Tuple[Optional[str], str]:
     """Convenience function for code extraction
 
@@ -377,8 +426,7 @@ def extract_code(response: str, filename: str) -> Tuple[Optional[str], str]:
     Returns:
         Tuple of (code, status_message)
     """
-    extractor = CodeExtractor()
-    return extractor.extract(response, filename)
+    return _EXTRACTOR.extract(response, filename)
 
 
 def validate_file_content(content: str, filename: str) -> Tuple[bool, str]:
@@ -391,6 +439,4 @@ def validate_file_content(content: str, filename: str) -> Tuple[bool, str]:
     Returns:
         Tuple of (is_valid, message)
     """
-    extractor = CodeExtractor()
-    file_ext = Path(filename).suffix.lower()
-    return extractor._validate_content_type(content, file_ext)
+    return _EXTRACTOR._validate_content_type(content, _file_ext(filename))
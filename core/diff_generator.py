@@ -6,9 +6,50 @@ with targeted edits to specific code blocks.
 Part of Phase 5: Diff-Based Editing
 """
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import Iterator, List, Tuple, Optional
+import heapq
+import logging
 import re
 
+try:
+    # C-accelerated drop-in for difflib's matcher, used when installed
+    from cdifflib import CSequenceMatcher as SequenceMatcher
+except ImportError:
+    from difflib import SequenceMatcher
+
+logger = logging.getLogger(__name__)
+
+# parse_edit_blocks section header and _parse_single_edit field patterns
+_EDIT_HEADER_RE = re.compile(r'EDIT\s+\d+:')
+_LINES_RE = re.compile(r'Lines?:\s*(\d+)(?:\s*-\s*(\d+))?')
+_DESCRIPTION_RE = re.compile(r'Description:\s*([^\n]+)')
+_OLD_RE = re.compile(r'Old:\s*```[^\n]*\n(.*?)```', re.DOTALL)
+_NEW_RE = re.compile(r'New:\s*```[^\n]*\n(.*?)```', re.DOTALL)
+
+
+def _iter_edit_sections(text: str) -> Iterator[str]:
+    """Yield the text after each EDIT header, up to the next header
+
+    Same pieces as re.split(r'EDIT\s+\d+:', text)[1:], one at a time.
+    """
+    section_start = None
+    for header in _EDIT_HEADER_RE.finditer(text):
+        if section_start is not None:
+            yield text[section_start:header.start()]
+        section_start = header.end()
+    if section_start is not None:
+        yield text[section_start:]
+
+
+def _format_hunk_range(start: int, stop: int) -> str:
+    """Format a 0-based [start, stop) slice as a unified diff hunk range"""
+    length = stop - start
+    if length == 1:
+        return f"{start + 1}"
+    if not length:
+        return f"{start},0"
+    return f"{start + 1},{length}"
+
 
 @dataclass
 class EditBlock:
@@ -46,11 +87,9 @@ class DiffGenerator:
             Prompt for model to generate edit blocks
         """
         # Number the lines for easy reference
-        numbered_lines = []
-        for i, line in enumerate(code.split('\n'), 1):
-            numbered_lines.append(f"{i:4d} | {line}")
-
-        numbered_code = '\n'.join(numbered_lines)
+        numbered_code = '\n'.join(
+            f"{i:4d} | {line}" for i, line in enumerate(code.split('\n'), 1)
+        )
 
         prompt = f"""You are editing the file: {filename}
 
@@ -98,17 +137,15 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
         """
         edits = []
 
-        # Split response into individual edits
-        edit_sections = re.split(r'EDIT\s+\d+:', model_response)
-
-        for section in edit_sections[1:]:  # Skip first empty split
+        # Walk the individual edits (text before the first header is skipped)
+        for section in _iter_edit_sections(model_response):
             try:
                 edit = self._parse_single_edit(section)
                 if edit:
                     edits.append(edit)
             except Exception as e:
                 # Log parsing error but continue
-                print(f"Warning: Failed to parse edit block: {e}")
+                logger.warning("Failed to parse edit block: %s", e)
                 continue
 
         return edits
@@ -123,7 +160,7 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
             Parsed EditBlock or None if parsing fails
         """
         # Extract line range
-        lines_match = re.search(r'Lines?:\s*(\d+)(?:\s*-\s*(\d+))?', section)
+        lines_match = _LINES_RE.search(section)
         if not lines_match:
             return None
 
@@ -131,15 +168,15 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
         end_line = int(lines_match.group(2)) if lines_match.group(2) else start_line
 
         # Extract description
-        desc_match = re.search(r'Description:\s*([^\n]+)', section)
+        desc_match = _DESCRIPTION_RE.search(section)
         description = desc_match.group(1).strip() if desc_match else "No description"
 
         # Extract old content
-        old_match = re.search(r'Old:\s*```[^\n]*\n(.*?)```', section, re.DOTALL)
+        old_match = _OLD_RE.search(section)
         old_content = old_match.group(1).strip() if old_match else ""
 
         # Extract new content
-        new_match = re.search(r'New:\s*```[^\n]*\n(.*?)```', section, re.DOTALL)
+        new_match = _NEW_RE.search(section)
         new_content = new_match.group(1).strip() if new_match else ""
 
         return EditBlock(
@@ -169,10 +206,54 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
 
         lines = original.split('\n')
 
+        # Anything overlapping or inverted keeps the bottom-up slice
+        # assignment, where each edit sees the lines left by the last one
+        if not self._disjoint(sorted_edits):
+            return self._apply_bottom_up(lines, sorted_edits)
+
+        # Disjoint edits never shift each other, so they can be spliced in
+        # one forward pass instead of shifting the list tail per edit
+        num_lines = len(lines)
+        applied = []
+        for edit in sorted_edits:
+            if edit.start_line < 1 or edit.end_line > num_lines:
+                logger.warning("Edit lines %d-%d out of range (file has %d lines)",
+                               edit.start_line, edit.end_line, num_lines)
+                continue
+            applied.append(edit)
+
+        out = []
+        cursor = 0
+        for edit in reversed(applied):
+            out.extend(lines[cursor:edit.start_line - 1])
+            if edit.new_content:
+                out.append(edit.new_content)
+            cursor = edit.end_line
+        out.extend(lines[cursor:])
+
+        return '\n'.join(out)
+
+    @staticmethod
+    def _disjoint(sorted_edits: List[EditBlock]) -> bool:
+        """Whether edits (sorted by start_line, descending) are well-formed
+        and share no lines"""
+        below = None
+        for edit in sorted_edits:
+            if edit.start_line > edit.end_line:
+                return False
+            if below is not None and edit.end_line >= below.start_line:
+                return False
+            below = edit
+        return True
+
+    @staticmethod
+    def _apply_bottom_up(lines: List[str], sorted_edits: List[EditBlock]) -> str:
+        """Apply edits (sorted by start_line, descending) by slice assignment"""
         for edit in sorted_edits:
             # Validate line numbers
             if edit.start_line < 1 or edit.end_line > len(lines):
-                print(f"Warning: Edit lines {edit.start_line}-{edit.end_line} out of range (file has {len(lines)} lines)")
+                logger.warning("Edit lines %d-%d out of range (file has %d lines)",
+                               edit.start_line, edit.end_line, len(lines))
                 continue
 
             # Apply edit (convert to 0-based indexing)
@@ -196,8 +277,8 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
             List of validation error messages (empty if valid)
         """
         errors = []
-        lines = original.split('\n')
-        num_lines = len(lines)
+        num_lines = original.count('\n') + 1
+        lines = None  # Only split when an edit has old content to compare
 
         for i, edit in enumerate(edits):
             # Check line numbers
@@ -212,6 +293,8 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
 
             # Check old content matches (optional but recommended)
             if edit.old_content:
+                if lines is None:
+                    lines = original.split('\n')
                 actual_lines = lines[edit.start_line-1:edit.end_line]
                 actual_content = '\n'.join(actual_lines).strip()
                 expected_content = edit.old_content.strip()
@@ -223,27 +306,24 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
                         f"Actual: {actual_content[:50]}..."
                     )
 
-        # Check for overlapping edits
-        edit_ranges = [(e.start_line, e.end_line) for e in edits]
-        for i, (start1, end1) in enumerate(edit_ranges):
-            for j, (start2, end2) in enumerate(edit_ranges[i+1:], start=i+1):
-                if self._ranges_overlap(start1, end1, start2, end2):
-                    errors.append(f"Edit {i+1} and Edit {j+1} have overlapping line ranges")
+        # Check for overlapping edits: sweep in start_line order, keeping
+        # a heap of earlier edits (by end_line) that may still overlap
+        overlaps = []
+        open_edits = []
+        for i in sorted(range(len(edits)), key=lambda k: edits[k].start_line):
+            start, end = edits[i].start_line, edits[i].end_line
+            while open_edits and open_edits[0][0] < start:
+                heapq.heappop(open_edits)
+            for _, j in open_edits:
+                if edits[j].start_line <= end:
+                    overlaps.append((min(i, j), max(i, j)))
+            heapq.heappush(open_edits, (end, i))
+
+        for i, j in sorted(overlaps):
+            errors.append(f"Edit {i+1} and Edit {j+1} have overlapping line ranges")
 
         return errors
 
-    def _ranges_overlap(self, start1: int, end1: int, start2: int, end2: int) -> bool:
-        """Check if two line ranges overlap
-
-        Args:
-            start1, end1: First range
-            start2, end2: Second range
-
-        Returns:
-            True if ranges overlap
-        """
-        return not (end1 < start2 or end2 < start1)
-
     def generate_unified_diff(self, original: str, modified: str, filename: str = "file") -> str:
         """Generate unified diff format for display
 
@@ -255,20 +335,49 @@ Do NOT regenerate the entire file. Only specify the blocks that need to change.
         Returns:
             Unified diff string
         """
-        import difflib
+        return '\n'.join(self.iter_unified_diff(original, modified, filename))
 
-        original_lines = original.split('\n')
-        modified_lines = modified.split('\n')
+    def iter_unified_diff(self, original: str, modified: str, filename: str = "file",
+                          context: int = 3) -> Iterator[str]:
+        """Yield unified diff lines one at a time
 
-        diff = difflib.unified_diff(
-            original_lines,
-            modified_lines,
-            fromfile=f"{filename} (original)",
-            tofile=f"{filename} (modified)",
-            lineterm=''
-        )
+        Same output as difflib.unified_diff (with lineterm=''), but the
+        matcher is cdifflib's C implementation when it is installed.
+
+        Args:
+            original: Original file content
+            modified: Modified file content
+            filename: Name of file (for diff header)
+            context: Number of unchanged lines around each hunk
 
-        return '\n'.join(diff)
+        Yields:
+            Diff lines without trailing newlines
+        """
+        a = original.split('\n')
+        b = modified.split('\n')
+
+        started = False
+        for group in SequenceMatcher(None, a, b).get_grouped_opcodes(context):
+            if not started:
+                started = True
+                yield f"--- {filename} (original)"
+                yield f"+++ {filename} (modified)"
+
+            first, last = group[0], group[-1]
+            yield (f"@@ -{_format_hunk_range(first[1], last[2])} "
+                   f"+{_format_hunk_range(first[3], last[4])} @@")
+
+            for tag, i1, i2, j1, j2 in group:
+                if tag == 'equal':
+                    for line in a[i1:i2]:
+                        yield ' ' + line
+                    continue
+                if tag != 'insert':
+                    for line in a[i1:i2]:
+                        yield '-' + line
+                if tag != 'delete':
+                    for line in b[j1:j2]:
+                        yield '+' + line
 
     def estimate_token_savings(self, original: str, edits: List[EditBlock]) -> dict:
         """Estimate token savings from using diffs vs full file regeneration
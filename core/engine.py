@@ -1,15 +1,14 @@
 """Main Codey engine - orchestrates all components"""
 import sys
+from functools import cached_property
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from utils.config import config
-from models.manager import ModelManager
 from core.tools import FileTools
 from core.parser import CommandParser
-from agents.coding_agent import CodingAgent
 from memory.store import MemoryStore
 
 class CodeyEngine:
@@ -17,14 +16,37 @@ class CodeyEngine:
 
     def __init__(self):
         self.config = config
-        self.model_manager = ModelManager(self.config)
         self.file_tools = FileTools(self.config)
         self.parser = CommandParser()
         self.memory = MemoryStore(self.config)
-        self.coding_agent = CodingAgent(self.model_manager, self.file_tools, self.config)
 
         self.memory.start_session()
 
+        # process_command dispatch: parsed action -> handler
+        self._handlers = {
+            'create': self._handle_create,
+            'edit': self._handle_edit,
+            'read': self._handle_read,
+            'delete': self._handle_delete,
+            'list': self._handle_list,
+            'general': self._handle_general,
+        }
+
+    # The model stack is built on first use, so file commands such as
+    # read, list and delete never import llama.cpp or load a model
+
+    @cached_property
+    def model_manager(self):
+        """Model manager, created on first access"""
+        from models.manager import ModelManager
+        return ModelManager(self.config)
+
+    @cached_property
+    def coding_agent(self):
+        """Coding agent, created on first access"""
+        from agents.coding_agent import CodingAgent
+        return CodingAgent(self.model_manager, self.file_tools, self.config)
+
     def process_command(self, user_input):
         """Process a natural language command"""
         if not user_input or not user_input.strip():
@@ -37,105 +59,9 @@ class CodeyEngine:
         instructions = parsed['instructions']
 
         # Execute based on action
-        result = None
-        response = None
-
+        handler = self._handlers.get(action, self._handle_unknown)
         try:
-            if action == 'create':
-                if not filename:
-                    filename = self.parser.extract_filename(user_input)
-                    if not filename:
-                        return "I couldn't determine the filename. Please specify a filename, e.g., 'create hello.py that prints hello world'"
-
-                result = self.coding_agent.create_file(filename, instructions)
-
-                if result['success']:
-                    self.memory.add_file_action(filename, 'created', {'instructions': instructions})
-                    response = f"Created {filename}"
-                    if self.config.require_confirmation:
-                        response += f"\n\n{self._show_preview(result['content'])}"
-                else:
-                    response = f"Error: {result['error']}"
-
-            elif action == 'edit':
-                if not filename:
-                    return "Please specify which file to edit."
-
-                result = self.coding_agent.edit_file(filename, instructions)
-
-                if result['success']:
-                    self.memory.add_file_action(filename, 'edited', {'instructions': instructions})
-                    response = f"Updated {filename}"
-                    if result.get('backup'):
-                        response += f"\n(Backup saved to {result['backup']})"
-                    if self.config.require_confirmation:
-                        response += f"\n\n{self._show_preview(result['content'])}"
-                else:
-                    response = f"Error: {result['error']}"
-
-            elif action == 'read':
-                if not filename:
-                    return "Please specify which file to read."
-
-                result = self.file_tools.read_file(filename)
-
-                if result['success']:
-                    response = f"Contents of {filename}:\n\n{result['content']}"
-                else:
-                    response = f"Error: {result['error']}"
-
-            elif action == 'delete':
-                if not filename:
-                    return "Please specify which file to delete."
-
-                # Confirmation for delete
-                if self.config.require_confirmation:
-                    confirm = input(f"Are you sure you want to delete {filename}? (yes/no): ")
-                    if confirm.lower() not in ['yes', 'y']:
-                        return "Delete cancelled."
-
-                result = self.file_tools.delete_file(filename)
-
-                if result['success']:
-                    self.memory.add_file_action(filename, 'deleted')
-                    response = f"Deleted {filename}"
-                    if result.get('backup'):
-                        response += f"\n(Backup saved to {result['backup']})"
-                else:
-                    response = f"Error: {result['error']}"
-
-            elif action == 'list':
-                result = self.file_tools.list_files()
-
-                if result['success']:
-                    if result['files']:
-                        response = "Files in workspace:\n" + "\n".join(f"  - {f}" for f in result['files'])
-                    else:
-                        response = "No files in workspace."
-                else:
-                    response = f"Error: {result['error']}"
-
-            elif action == 'general':
-                # Try to infer what the user wants
-                intent = self.parser.infer_intent(user_input)
-
-                if intent == 'code_explanation':
-                    # Look for filename in input
-                    filename = self.parser.extract_filename(user_input)
-                    if filename:
-                        result = self.coding_agent.explain_code(filename)
-                        if result['success']:
-                            response = result['explanation']
-                        else:
-                            response = f"Error: {result['error']}"
-                    else:
-                        response = "Which file would you like me to explain?"
-                else:
-                    response = self._handle_general_query(user_input)
-
-            else:
-                response = f"I'm not sure how to handle that command. Try: create, edit, read, delete, or list files."
-
+            response = handler(filename, instructions, user_input)
         except Exception as e:
             response = f"An error occurred: {str(e)}"
 
@@ -144,6 +70,107 @@ class CodeyEngine:
 
         return response
 
+    def _handle_create(self, filename, instructions, user_input):
+        """Handle file creation"""
+        if not filename:
+            filename = self.parser.extract_filename(user_input)
+            if not filename:
+                return "I couldn't determine the filename. Please specify a filename, e.g., 'create hello.py that prints hello world'"
+
+        result = self.coding_agent.create_file(filename, instructions)
+
+        if not result['success']:
+            return f"Error: {result['error']}"
+
+        self.memory.add_file_action(filename, 'created', {'instructions': instructions})
+        response = f"Created {filename}"
+        if self.config.require_confirmation:
+            response += f"\n\n{self._show_preview(result['content'])}"
+        return response
+
+    def _handle_edit(self, filename, instructions, user_input):
+        """Handle file editing"""
+        if not filename:
+            return "Please specify which file to edit."
+
+        result = self.coding_agent.edit_file(filename, instructions)
+
+        if not result['success']:
+            return f"Error: {result['error']}"
+
+        self.memory.add_file_action(filename, 'edited', {'instructions': instructions})
+        response = f"Updated {filename}"
+        if result.get('backup'):
+            response += f"\n(Backup saved to {result['backup']})"
+        if self.config.require_confirmation:
+            response += f"\n\n{self._show_preview(result['content'])}"
+        return response
+
+    def _handle_read(self, filename, instructions, user_input):
+        """Handle file reading"""
+        if not filename:
+            return "Please specify which file to read."
+
+        result = self.file_tools.read_file(filename)
+
+        if result['success']:
+            return f"Contents of {filename}:\n\n{result['content']}"
+        return f"Error: {result['error']}"
+
+    def _handle_delete(self, filename, instructions, user_input):
+        """Handle file deletion"""
+        if not filename:
+            return "Please specify which file to delete."
+
+        # Confirmation for delete
+        if self.config.require_confirmation:
+            confirm = input(f"Are you sure you want to delete {filename}? (yes/no): ")
+            if confirm.lower() not in ['yes', 'y']:
+                return "Delete cancelled."
+
+        result = self.file_tools.delete_file(filename)
+
+        if not result['success']:
+            return f"Error: {result['error']}"
+
+        self.memory.add_file_action(filename, 'deleted')
+        response = f"Deleted {filename}"
+        if result.get('backup'):
+            response += f"\n(Backup saved to {result['backup']})"
+        return response
+
+    def _handle_list(self, filename, instructions, user_input):
+        """Handle file listing"""
+        result = self.file_tools.list_files()
+
+        if not result['success']:
+            return f"Error: {result['error']}"
+        if result['files']:
+            return "Files in workspace:\n" + "\n".join(f"  - {f}" for f in result['files'])
+        return "No files in workspace."
+
+    def _handle_general(self, filename, instructions, user_input):
+        """Handle anything else: code explanations or general questions"""
+        # Try to infer what the user wants
+        intent = self.parser.infer_intent(user_input)
+
+        if intent != 'code_explanation':
+            return self._handle_general_query(user_input)
+
+        # Look for filename in input
+        filename = self.parser.extract_filename(user_input)
+        if not filename:
+            return "Which file would you like me to explain?"
+
+        result = self.coding_agent.explain_code(filename)
+        if result['success']:
+            return result['explanation']
+        return f"Error: {result['error']}"
+
+    def _handle_unknown(self, filename, instructions, user_input):
+        """Handle an action with no handler"""
+        return "I'm not sure how to handle that command. Try: create, edit, read, delete, or list files."
+
     def _handle_general_query(self, query):
         """Handle general queries or conversations"""
         # For general questions, use the model directly
@@ -171,4 +198,6 @@ Codey:"""
     def shutdown(self):
         """Clean shutdown"""
         self.memory.save_memory()
-        self.model_manager.unload_model()
+        # Nothing to unload if no command ever needed the model
+        if 'model_manager' in self.__dict__:
+            self.model_manager.unload_model()
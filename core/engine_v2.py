@@ -8,7 +8,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils.config import config
 from models.manager import ModelManager
 from core.tools import FileTools
-from core.parser import CommandParser
+from core.parser import CommandParser, match_command
 from core.permission_manager import PermissionManager
 from core.git_manager import GitManager
 from core.shell_manager import ShellManager
@@ -19,6 +19,10 @@ from agents.debug_agent import DebugAgent
 from memory.store import MemoryStore
 from utils.cleanup import CleanupManager
 
+# _is_complex_instruction markers
+_STEP_DIGITS = frozenset('123456789')
+_SETUP_WORDS = ('create', 'install', 'clone', 'set up', 'configure')
+
 class CodeyEngineV2:
     """Enhanced engine with hybrid reasoning, git, shell, and Claude Code-like capabilities"""
 
@@ -49,56 +53,67 @@ class CodeyEngineV2:
         # Initialize cleanup manager
         self.cleanup_manager = CleanupManager(self.config.workspace_dir)
 
+        # match_command route -> handler taking the raw input and returning
+        # the whole response ('ask' streams, so it is dispatched separately)
+        self._command_routes = {
+            'plan': lambda text: self._handle_plan_command(text[5:]),
+            'execute_plan': lambda text: self._execute_plan(),
+            'show_plan': lambda text: self._show_plan(),
+            'debug': lambda text: self._handle_debug_command(text[6:]),
+            'git': self._handle_git_command,
+            'shell': self._handle_shell_command,
+            'info': lambda text: self._show_system_info(),
+        }
+
         self.memory.start_session()
 
         # Show initialization info with profile details
+        # Assembled first and written once rather than line by line
         profile_info = self.config.get_profile_info()
-        print(f"\n✓ Codey initialized - Claude Code Edition v2.1")
-        print(f"✓ Profile: {profile_info['name']}")
-        print(f"  └─ {profile_info['description']}")
-        print(f"✓ Context: {self.config.context_size} tokens")
-        print(f"✓ GPU layers: {self.config.n_gpu_layers}")
-        print(f"✓ Threads: {self.config.n_threads}")
-        print(f"✓ Git enabled: {self.config.git_enabled}")
-        print(f"✓ Shell enabled: {self.config.shell_enabled}")
+        sys.stdout.write("\n".join((
+            "\n✓ Codey initialized - Claude Code Edition v2.1",
+            f"✓ Profile: {profile_info['name']}",
+            f"  └─ {profile_info['description']}",
+            f"✓ Context: {self.config.context_size} tokens",
+            f"✓ GPU layers: {self.config.n_gpu_layers}",
+            f"✓ Threads: {self.config.n_threads}",
+            f"✓ Git enabled: {self.config.git_enabled}",
+            f"✓ Shell enabled: {self.config.shell_enabled}",
+        )) + "\n")
+        sys.stdout.flush()
 
     def process_command(self, user_input):
         """Process a natural language command with hybrid reasoning"""
+        return ''.join(self.process_command_stream(user_input))
+
+    def process_command_stream(self, user_input):
+        """Process a command, yielding the response in pieces
+
+        Perplexity questions and local-model answers are yielded as they
+        are generated; every other command yields its complete response
+        once.
+        """
         if not user_input or not user_input.strip():
-            return "Please enter a command."
+            yield "Please enter a command."
+            return
 
         # IMPORTANT: Check for complex multi-step instruction FIRST
         # This prevents the model from generating responses before we detect complexity
         if self._is_complex_instruction(user_input):
-            return self._handle_complex_instruction(user_input)
+            yield self._handle_complex_instruction(user_input)
+            return
 
         # Check for special commands
-        if user_input.lower().startswith('plan '):
-            return self._handle_plan_command(user_input[5:])
-
-        if user_input.lower() == 'execute plan':
-            return self._execute_plan()
-
-        if user_input.lower() == 'show plan':
-            return self._show_plan()
+        route = match_command(user_input)
 
-        if user_input.lower().startswith('debug '):
-            return self._handle_debug_command(user_input[6:])
+        if route == 'ask':
+            yield from self._ask_perplexity_stream(user_input[4:])
+            return
 
-        if user_input.lower().startswith('ask '):
-            return self._ask_perplexity(user_input[4:])
-
-        # Git commands
-        if user_input.lower().startswith(('git ', 'clone ', 'commit ', 'push ', 'pull ')):
-            return self._handle_git_command(user_input)
-
-        # Shell commands
-        if user_input.lower().startswith(('run ', 'execute ', 'install ', 'mkdir ')):
-            return self._handle_shell_command(user_input)
-
-        # System info
-        if user_input.lower() in ['info', 'system info', 'model info']:
-            return self._show_system_info()
+        handler = self._command_routes.get(route)
+        if handler is not None:
+            yield handler(user_input)
+            return
 
         # Parse the command
         parsed = self.parser.parse(user_input)
@@ -109,37 +124,42 @@ class CodeyEngineV2:
         # Determine if we should use hybrid reasoning
         use_hybrid = self._should_use_hybrid(user_input, action)
 
-        response = None
-
+        pieces = []
         try:
-            if action == 'create':
-                response = self._handle_create(filename, instructions, user_input, use_hybrid)
+            if action == 'general':
+                for piece in self._handle_general_stream(user_input, use_hybrid):
+                    pieces.append(piece)
+                    yield piece
 
-            elif action == 'edit':
-                response = self._handle_edit(filename, instructions, use_hybrid)
+            else:
+                if action == 'create':
+                    response = self._handle_create(filename, instructions, user_input, use_hybrid)
 
-            elif action == 'read':
-                response = self._handle_read(filename)
+                elif action == 'edit':
+                    response = self._handle_edit(filename, instructions, use_hybrid)
 
-            elif action == 'delete':
-                response = self._handle_delete(filename)
+                elif action == 'read':
+                    response = self._handle_read(filename)
 
-            elif action == 'list':
-                response = self._handle_list()
+                elif action == 'delete':
+                    response = self._handle_delete(filename)
 
-            elif action == 'general':
-                response = self._handle_general(user_input, use_hybrid)
+                elif action == 'list':
+                    response = self._handle_list()
 
-            else:
-                response = "I'm not sure how to handle that command. Try: create, edit, read, delete, list files, plan, debug, or ask."
+                else:
+                    response = "I'm not sure how to handle that command. Try: create, edit, read, delete, list files, plan, debug, or ask."
+
+                pieces.append(response)
+                yield response
 
         except Exception as e:
             response = f"An error occurred: {str(e)}"
+            pieces.append(response)
+            yield response
 
         # Store in memory
-        self.memory.add_conversation(user_input, response, action)
-
-        return response
+        self.memory.add_conversation(user_input, ''.join(pieces), action)
 
     def _should_use_hybrid(self, user_input, action):
         """Determine if hybrid reasoning (Perplexity) should be used"""
@@ -168,7 +188,7 @@ class CodeyEngineV2:
         perplexity_code = None
         if use_hybrid:
             print("[Hybrid Mode] Consulting Perplexity for best practices...")
-            extension = filename.split('.')[-1] if '.' in filename else 'py'
+            extension = filename.rpartition('.')[2] if '.' in filename else 'py'
             language = self.coding_agent._infer_language(extension)
 
             perplexity_code = self.perplexity.get_code_from_perplexity(instructions, language)
@@ -273,8 +293,8 @@ class CodeyEngineV2:
         else:
             return f"Error: {result['error']}"
 
-    def _handle_general(self, query, use_hybrid):
-        """Handle general queries with hybrid reasoning"""
+    def _handle_general_stream(self, query, use_hybrid):
+        """Handle general queries with hybrid reasoning, yielding the answer"""
         intent = self.parser.infer_intent(query)
 
         if intent == 'code_explanation':
@@ -282,24 +302,26 @@ class CodeyEngineV2:
             if filename:
                 result = self.coding_agent.explain_code(filename)
                 if result['success']:
-                    return result['explanation']
+                    yield result['explanation']
                 else:
-                    return f"Error: {result['error']}"
+                    yield f"Error: {result['error']}"
             else:
-                return "Which file would you like me to explain?"
+                yield "Which file would you like me to explain?"
+            return
 
         # Use hybrid reasoning for complex queries
         if use_hybrid and self.perplexity:
             print("[Hybrid Mode] Consulting Perplexity...")
             response = self.perplexity.ask_perplexity(query)
             if response:
-                return response
+                yield response
+                return
 
         # Fall back to local model
-        return self._local_query(query)
+        yield from self._local_query_stream(query)
 
-    def _local_query(self, query):
-        """Handle query with local model"""
+    def _local_query_stream(self, query):
+        """Handle query with local model, yielding tokens as they are generated"""
         prompt = f"""You are Codey, a helpful coding assistant. Answer concisely:
 
 User: {query}
@@ -307,9 +329,9 @@ User: {query}
 Codey:"""
 
         try:
-            return self.model_manager.generate(prompt, max_tokens=512)
+            yield from self.model_manager.generate_stream(prompt, max_tokens=512)
         except Exception as e:
-            return f"Error: {str(e)}"
+            yield f"Error: {str(e)}"
 
     def _handle_plan_command(self, request):
         """Create a plan for a complex task"""
@@ -410,18 +432,20 @@ Codey:"""
 
         return response
 
-    def _ask_perplexity(self, question):
-        """Ask Perplexity a question directly"""
+    def _ask_perplexity_stream(self, question):
+        """Ask Perplexity a question directly, yielding the answer as it arrives"""
         if not self.perplexity:
-            return "Perplexity API not available. Check configuration."
+            yield "Perplexity API not available. Check configuration."
+            return
 
         print("Asking Perplexity...")
-        response = self.perplexity.ask_perplexity(question)
+        received = False
+        for delta in self.perplexity.ask_perplexity_stream(question):
+            received = True
+            yield delta
 
-        if response:
-            return response
-        else:
-            return "Failed to get response from Perplexity."
+        if not received:
+            yield "Failed to get response from Perplexity."
 
     def _show_preview(self, content, max_lines=10):
         """Show a preview of file content"""
@@ -654,31 +678,28 @@ Codey:"""
 
     def _is_complex_instruction(self, user_input: str) -> bool:
         """Detect if instruction contains multiple steps or is complex"""
-        # Indicators of complex instructions
-        complexity_indicators = [
-            # Multiple sentences or steps
-            len(user_input.split('.')) > 2,
-            len(user_input.split('\n')) > 2,
-
-            # Numbered/bulleted lists
-            any(user_input.strip().startswith(str(i)) for i in range(1, 10)),
-            '1.' in user_input or '2.' in user_input,
-
-            # Multiple actions
-            user_input.count(' then ') > 0,
-            user_input.count(' and then ') > 0,
-            user_input.count(' after ') > 0,
-
-            # Keywords suggesting multi-step tasks
-            'set up' in user_input.lower() and ('project' in user_input.lower() or 'environment' in user_input.lower()),
-            'follow these' in user_input.lower(),
-            'step by step' in user_input.lower(),
-
-            # Very long instructions (likely complex)
-            len(user_input) > 200 and any(word in user_input.lower() for word in ['create', 'install', 'clone', 'set up', 'configure'])
-        ]
-
-        return any(complexity_indicators)
+        # Cheapest checks first; every command passes through here
+        # Multiple sentences or steps
+        if user_input.count('.') > 1 or user_input.count('\n') > 1:
+            return True
+
+        # Numbered/bulleted lists
+        if user_input.strip()[:1] in _STEP_DIGITS or '1.' in user_input or '2.' in user_input:
+            return True
+
+        # Multiple actions (' and then ' is covered by ' then ')
+        if ' then ' in user_input or ' after ' in user_input:
+            return True
+
+        # Keywords suggesting multi-step tasks
+        lower = user_input.lower()
+        if 'set up' in lower and ('project' in lower or 'environment' in lower):
+            return True
+        if 'follow these' in lower or 'step by step' in lower:
+            return True
+
+        # Very long instructions (likely complex)
+        return len(user_input) > 200 and any(word in lower for word in _SETUP_WORDS)
 
     def _handle_complex_instruction(self, user_input: str):
         """Handle complex multi-step instructions by breaking them down automatically"""
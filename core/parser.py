@@ -10,6 +10,31 @@ For new code, use:
 """
 import re
 import warnings
+from typing import Optional
+
+# Engine commands recognised by a fixed prefix (or exact text), matched in
+# one pass; the name of the matching group is the route
+_COMMAND_RE = re.compile(
+    r'(?P<execute_plan>execute plan\Z)'
+    r'|(?P<show_plan>show plan\Z)'
+    r'|(?P<info>(?:system |model )?info\Z)'
+    r'|(?P<plan>plan )'
+    r'|(?P<debug>debug )'
+    r'|(?P<ask>ask )'
+    r'|(?P<git>(?:git|clone|commit|push|pull) )'
+    r'|(?P<shell>(?:run|execute|install|mkdir) )',
+    re.IGNORECASE
+)
+
+
+def match_command(user_input: str) -> Optional[str]:
+    """Return the route for a prefixed engine command, or None
+
+    Routes: 'plan', 'execute_plan', 'show_plan', 'debug', 'ask', 'git',
+    'shell' and 'info'. Anything else is left to natural-language parsing.
+    """
+    match = _COMMAND_RE.match(user_input)
+    return match.lastgroup if match else None
 
 
 class CommandParser:
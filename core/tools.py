@@ -172,6 +172,23 @@ class FileTools:
             'path': str(path)
         }
 
+    def file_stat(self, filepath):
+        """Return a file's modification time and size"""
+        path = self._resolve_path(filepath)
+        try:
+            stat = path.stat()
+        except OSError as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        return {
+            'success': True,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'path': str(path)
+        }
+
     def patch_file(self, filepath, edits):
         """Apply diff-based edits to a file (Phase 5)
 
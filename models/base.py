@@ -1,7 +1,7 @@
 """Abstract base class for all model wrappers"""
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator
 import gc
 
 
@@ -12,6 +12,10 @@ class BaseModel(ABC):
     It provides common functionality for loading, unloading, and generating text.
     """
 
+    # Whether generate() may be called from several threads at once.
+    # llama.cpp contexts are not thread-safe, so local models opt out.
+    supports_concurrent = False
+
     def __init__(self, model_path: Path, config: Dict[str, Any]):
         """Initialize the base model
 
@@ -69,6 +73,21 @@ class BaseModel(ABC):
         """
         pass
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Generate text from prompt, yielding it as it is produced
+
+        The default implementation yields the full ``generate`` result
+        once; models that support token streaming override this.
+
+        Args:
+            prompt: Input text prompt
+            **kwargs: Same parameters as ``generate``
+
+        Yields:
+            Generated text fragments
+        """
+        yield self.generate(prompt, **kwargs)
+
     @property
     def loaded(self) -> bool:
         """Check if model is currently loaded in memory"""
@@ -5,7 +5,7 @@ designed for code generation, editing, refactoring, and review tasks.
 """
 import logging
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Iterator
 from pathlib import Path
 import json
 import re
@@ -187,6 +187,65 @@ RESTRICTIONS:
             logger.error(str(e))
             raise RuntimeError(f"Generation timeout after {timeout_seconds} seconds - check CPU performance")
 
+    def generate_stream(self, prompt: str, **kwargs) -> Iterator[str]:
+        """Generate text from prompt, yielding tokens as they are produced
+
+        Args:
+            prompt: Input prompt
+            **kwargs: Generation parameters (temperature, max_tokens, stop, timeout)
+
+        Yields:
+            Generated text fragments
+        """
+        if not self._loaded or not self._model:
+            raise RuntimeError("Model not loaded. Cannot generate.")
+
+        # Callers such as ModelManager pass None for unset parameters
+        temperature = kwargs.get('temperature')
+        max_tokens = kwargs.get('max_tokens')
+        timeout_seconds = kwargs.get('timeout')
+        yield from self._iter_tokens(
+            prompt,
+            temperature=0.3 if temperature is None else temperature,
+            max_tokens=max_tokens or 256,
+            stop=kwargs.get('stop'),
+            timeout_seconds=timeout_seconds or 300
+        )
+
+    def _iter_tokens(self, prompt: str, temperature: float = 0.3,
+                     max_tokens: int = 256, stop: list = None,
+                     timeout_seconds: int = 300) -> Iterator[str]:
+        """Yield non-empty token texts from the llama-cpp streaming API
+
+        Stops early (with a warning) once ``timeout_seconds`` have passed.
+        """
+        import time
+
+        start_time = time.time()
+        token_count = 0
+        stream = self._model(
+            prompt,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stop=stop or [],
+            echo=False,
+            stream=True
+        )
+
+        for chunk in stream:
+            # Check timeout
+            elapsed = time.time() - start_time
+            if elapsed > timeout_seconds:
+                logger.warning(f"Streaming timeout after {elapsed:.1f}s with {token_count} tokens")
+                break
+
+            # Extract token from chunk
+            if 'choices' in chunk and chunk['choices']:
+                token_text = chunk['choices'][0].get('text', '')
+                if token_text:
+                    token_count += 1
+                    yield token_text
+
     def _generate_streaming(self, prompt: str, temperature: float = 0.3,
                            max_tokens: int = 256, stop: list = None,
                            timeout_seconds: int = 300,
@@ -239,40 +298,20 @@ RESTRICTIONS:
                 logger.debug("StreamingFileWriter not available, using standard streaming")
 
         try:
-            # Use llama-cpp streaming API
-            stream = self._model(
-                prompt,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                stop=stop or [],
-                echo=False,
-                stream=True
-            )
-
-            for chunk in stream:
-                # Check timeout
-                elapsed = time.time() - start_time
-                if elapsed > timeout_seconds:
-                    logger.warning(f"Streaming timeout after {elapsed:.1f}s with {token_count} tokens")
-                    break
-
-                # Extract token from chunk
-                if 'choices' in chunk and chunk['choices']:
-                    token_text = chunk['choices'][0].get('text', '')
-                    if token_text:
-                        generated_text += token_text
-                        token_count += 1
-
-                        # Process through streaming writer for real-time file writing
-                        if streaming_writer:
-                            streaming_writer.process_token(token_text, target_filename)
-
-                        # Show progress every 2 seconds
-                        current_time = time.time()
-                        if current_time - last_progress_time >= 2.0:
-                            tps = token_count / (current_time - start_time)
-                            print(f"\r   → {token_count} tokens ({tps:.1f} tok/s)", end="", flush=True)
-                            last_progress_time = current_time
+            for token_text in self._iter_tokens(prompt, temperature, max_tokens, stop, timeout_seconds):
+                generated_text += token_text
+                token_count += 1
+
+                # Process through streaming writer for real-time file writing
+                if streaming_writer:
+                    streaming_writer.process_token(token_text, target_filename)
+
+                # Show progress every 2 seconds
+                current_time = time.time()
+                if current_time - last_progress_time >= 2.0:
+                    tps = token_count / (current_time - start_time)
+                    print(f"\r   → {token_count} tokens ({tps:.1f} tok/s)", end="", flush=True)
+                    last_progress_time = current_time
 
             # Flush streaming writer
             if streaming_writer:
@@ -163,6 +163,48 @@ class ModelManager:
         except Exception as e:
             raise RuntimeError(f"Generation failed: {e}")
 
+    def generate_stream(self, prompt, temperature=None, max_tokens=None, stop=None):
+        """Generate text from the model, yielding tokens as they arrive"""
+        # If using lifecycle manager, delegate to it
+        if self._use_lifecycle:
+            model_obj = self._lifecycle.ensure_loaded(self._default_role)
+            yield from model_obj.generate_stream(
+                prompt,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stop=stop
+            )
+            return
+
+        # Legacy generation path
+        if not self.model_loaded:
+            self.load_model()
+
+        temp = temperature if temperature is not None else self.config.temperature
+        max_tok = max_tokens if max_tokens is not None else self.config.max_tokens
+
+        try:
+            stream = self.model(
+                prompt,
+                max_tokens=max_tok,
+                temperature=temp,
+                stop=stop or ["</s>", "User:", "Human:"],
+                echo=False,
+                stream=True
+            )
+            # Match generate(), which strips leading whitespace from the answer
+            started = False
+            for chunk in stream:
+                text = chunk['choices'][0]['text']
+                if not started:
+                    text = text.lstrip()
+                    if not text:
+                        continue
+                    started = True
+                yield text
+        except Exception as e:
+            raise RuntimeError(f"Generation failed: {e}")
+
     def get_model_info(self):
         """Get information about the loaded model"""
         # If using lifecycle manager, get info from it
@@ -0,0 +1,635 @@
+"""Unit tests for the agents package
+
+Run with: pytest tests/test_agents.py -v
+"""
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import Mock
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class TestDebugAgentStaticAnalysis(unittest.TestCase):
+    """Tests for DebugAgent static analysis"""
+
+    def setUp(self):
+        from agents.debug_agent import DebugAgent
+        self.agent = DebugAgent(Mock(), Mock())
+        self.agent.tools.file_stat.return_value = {
+            'success': True, 'mtime_ns': 1, 'size': 12
+        }
+
+    def _types(self, code):
+        return [(i['line'], i['type']) for i in self.agent._static_analysis(code)]
+
+    def test_detects_issues_in_line_order(self):
+        """Test TODO, bare except and print detection"""
+        code = (
+            "x = 1  # TODO fix\n"
+            "try:\n"
+            "    print(x)\n"
+            "except:\n"
+            "    pass\n"
+        )
+        self.assertEqual(
+            self._types(code),
+            [(1, 'todo'), (3, 'debug_print'), (4, 'bare_except')]
+        )
+
+    def test_ignores_matches_in_strings(self):
+        """Test that strings mentioning print( or except: are not flagged"""
+        code = 's = "print(1) except: pass"\n\ndef print_it():\n    pass\n'
+        self.assertEqual(self._types(code), [])
+
+    def test_typed_except_not_flagged(self):
+        """Test that except with a type is not reported"""
+        code = "try:\n    pass\nexcept ValueError:\n    pass\n"
+        self.assertEqual(self._types(code), [])
+
+    def test_unparsable_code_uses_line_scan(self):
+        """Test fallback when code has a syntax error"""
+        code = "def broken(:\n    print('x')  # FIXME\n"
+        self.assertEqual(self._types(code), [(2, 'todo'), (2, 'debug_print')])
+
+    def test_analyze_file_reports_syntax_error(self):
+        """Test analyze_file on a file that does not parse"""
+        self.agent.tools.read_file.return_value = {
+            'success': True, 'content': "def broken(:\n"
+        }
+        result = self.agent.analyze_file('broken.py')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['issues'][0]['type'], 'syntax_error')
+
+    def test_syntax_error_skips_static_scan_unless_full(self):
+        """Test that broken files report only the syntax error by default"""
+        self.agent.tools.read_file.return_value = {
+            'success': True, 'content': "def broken(:\n    print('x')\n"
+        }
+        quick = self.agent.analyze_file('broken.py')
+        full = self.agent.analyze_file('broken.py', full=True)
+
+        self.assertEqual([i['type'] for i in quick['issues']], ['syntax_error'])
+        self.assertEqual([i['type'] for i in full['issues']], ['syntax_error', 'debug_print'])
+
+    def test_unchanged_file_read_and_parsed_once(self):
+        """Test that debug_error reuses the cached read and parse"""
+        from unittest.mock import patch
+
+        self.agent.tools.read_file.return_value = {
+            'success': True, 'content': "x = 1\n"
+        }
+        with patch('agents.debug_agent.ast.parse', wraps=__import__('ast').parse) as parse:
+            self.agent.debug_error('ok.py')
+            self.agent.debug_error('ok.py')
+
+        self.assertEqual(self.agent.tools.read_file.call_count, 1)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_modified_file_is_reread(self):
+        """Test that a changed mtime invalidates the cache"""
+        self.agent.tools.read_file.return_value = {
+            'success': True, 'content': "x = 1\n"
+        }
+        self.agent.analyze_file('ok.py')
+        self.agent.tools.file_stat.return_value = {
+            'success': True, 'mtime_ns': 2, 'size': 12
+        }
+        self.agent.analyze_file('ok.py')
+
+        self.assertEqual(self.agent.tools.read_file.call_count, 2)
+
+
+class TestCompactCode(unittest.TestCase):
+    """Tests for the prompt-size limiter used by debug_error"""
+
+    def setUp(self):
+        self.code = '\n'.join(f"x{i} = {i}" for i in range(1, 2001))
+
+    def test_small_code_unchanged(self):
+        """Test that code under the limit is passed through"""
+        from agents.debug_agent import _compact_code
+        self.assertEqual(_compact_code("x = 1\n", [1]), "x = 1\n")
+
+    def test_keeps_context_around_focus_lines(self):
+        """Test that windows around reported lines survive truncation"""
+        from agents.debug_agent import _compact_code
+
+        compacted = _compact_code(self.code, [1000])
+        self.assertIn("x1000 = 1000", compacted)
+        self.assertIn("x980 = 980", compacted)
+        self.assertNotIn("x1 = 1\n", compacted)
+        self.assertLessEqual(len(compacted), 6000)
+
+    def test_head_and_tail_without_focus(self):
+        """Test the head/tail fallback when no lines are known"""
+        from agents.debug_agent import _compact_code
+
+        compacted = _compact_code(self.code, None)
+        self.assertTrue(compacted.startswith("x1 = 1"))
+        self.assertTrue(compacted.endswith("x2000 = 2000"))
+        self.assertLessEqual(len(compacted), 6000)
+
+
+class TestDebugAgentAnalyzeFiles(unittest.TestCase):
+    """Tests for DebugAgent.analyze_files"""
+
+    def test_matches_analyze_file(self):
+        """Test that parallel analysis gives the same results as analyze_file"""
+        from agents.debug_agent import DebugAgent
+
+        sources = {
+            'a.py': "print('hi')\n",
+            'b.py': "def broken(:\n",
+            'c.py': "try:\n    pass\nexcept:\n    pass\n",
+        }
+        tools = Mock()
+        tools.file_stat.return_value = {'success': False, 'error': 'not found'}
+        tools.read_file.side_effect = lambda f: (
+            {'success': True, 'content': sources[f]} if f in sources
+            else {'success': False, 'error': f"File not found: {f}"}
+        )
+
+        agent = DebugAgent(Mock(), tools)
+        results = agent.analyze_files(['a.py', 'missing.py', 'b.py', 'c.py'], max_workers=2)
+
+        self.assertEqual(list(results), ['a.py', 'missing.py', 'b.py', 'c.py'])
+        self.assertFalse(results['missing.py']['success'])
+        for filename in sources:
+            self.assertEqual(results[filename], agent.analyze_file(filename))
+
+
+class TestPerplexityBatch(unittest.TestCase):
+    """Tests for PerplexityAPI.batch"""
+
+    def test_batch_preserves_order(self):
+        """Test that batched results come back in call order"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        calls = [lambda i=i: i * 2 for i in range(10)]
+        self.assertEqual(api.batch(calls), [i * 2 for i in range(10)])
+
+    def test_batch_does_not_leak_connections(self):
+        """Test that workers reuse a connection and repeated batches leave none open"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        api.max_concurrent_requests = 2
+        before = len(PerplexityAPI._open_connections)
+        calls = [api._get_connection for _ in range(10)]
+
+        for _ in range(2):
+            opened = api.batch(calls)
+            self.assertLessEqual(len({id(conn) for conn in opened}), 2)
+            self.assertEqual(len(PerplexityAPI._open_connections), before)
+
+    def test_best_practices_batch_single_request(self):
+        """Test that several tasks are answered by one request"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        api._make_request = Mock(return_value='Sure: ["use logging", "close files"]')
+
+        answers = api.get_best_practices_batch(['a', 'b'])
+        self.assertEqual(answers, ['use logging', 'close files'])
+        self.assertEqual(api._make_request.call_count, 1)
+
+    def test_best_practices_batch_falls_back_on_bad_reply(self):
+        """Test per-task fallback when the combined reply is not a JSON array"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        api._make_request = Mock(return_value='no json here')
+        api.get_best_practices = Mock(side_effect=lambda task, language: f"tip {task}")
+
+        self.assertEqual(api.get_best_practices_batch(['a', 'b']), ['tip a', 'tip b'])
+
+    def test_suggest_improvements_for_files_uses_batch(self):
+        """Test that multi-file suggestions issue one batch"""
+        from agents.debug_agent import DebugAgent
+
+        perplexity = Mock()
+        perplexity.get_best_practices_batch.side_effect = lambda tasks, language: ['tip'] * len(tasks)
+        tools = Mock()
+        tools.file_stat.return_value = {'success': False, 'error': 'not found'}
+        tools.read_file.return_value = {'success': True, 'content': 'x = 1\n'}
+
+        agent = DebugAgent(Mock(), tools, perplexity)
+        results = agent.suggest_improvements_for_files(['a.py', 'b.py'])
+
+        perplexity.get_best_practices_batch.assert_called_once()
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[1]['suggestions'][0]['suggestion'], 'tip')
+
+
+class TestPerplexityCache(unittest.TestCase):
+    """Tests for the PerplexityAPI response cache"""
+
+    def _fake_post(self, calls):
+        import json
+
+        def post(body, headers):
+            calls.append(body)
+            result = {'choices': [{'message': {'content': f'answer {len(calls)}'}}]}
+            return json.dumps(result).encode('utf-8')
+
+        return post
+
+    def test_cached_request_hits_network_once(self):
+        """Test that identical cached requests reuse the response"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        calls = []
+        api._post = self._fake_post(calls)
+
+        first = api.get_best_practices('logging')
+        second = api.get_best_practices('logging')
+        uncached = api.ask_perplexity('logging')
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(uncached, 'answer 2')
+
+    def test_disk_cache_survives_new_instance(self):
+        """Test that cached answers are reloaded from disk"""
+        import tempfile
+        from agents.perplexity_api import PerplexityAPI
+
+        with tempfile.TemporaryDirectory() as tmp:
+            config = Mock()
+            config.perplexity = {}
+            config.log_dir = Path(tmp) / 'logs'
+
+            calls = []
+            api = PerplexityAPI('test-key', config)
+            api._post = self._fake_post(calls)
+            first = api.research_topic('caching')
+
+            fresh = PerplexityAPI('test-key', config)
+            fresh._post = self._fake_post(calls)
+            second = fresh.research_topic('caching')
+
+            self.assertEqual(first, second)
+            self.assertEqual(len(calls), 1)
+
+            fresh.clear_cache()
+            fresh.research_topic('caching')
+            self.assertEqual(len(calls), 2)
+
+
+    def _config(self, tmp, **settings):
+        config = Mock()
+        config.perplexity = settings
+        config.log_dir = Path(tmp) / 'logs'
+        return config
+
+    def test_disk_cache_prunes_expired_and_excess_entries(self):
+        """Test that the disk cache drops expired files and stays under its cap"""
+        import os
+        import tempfile
+        import time
+        from agents.perplexity_api import PerplexityAPI
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_dir = Path(tmp) / 'perplexity_cache'
+            cache_dir.mkdir()
+            old = time.time() - 7200
+            for name in ('expired.json', 'stale.json.1.tmp'):
+                (cache_dir / name).write_bytes(b'{}')
+                os.utime(cache_dir / name, (old, old))
+
+            api = PerplexityAPI('test-key', self._config(tmp, cache_ttl_seconds=3600, disk_cache_max_files=3))
+            self.assertEqual(list(cache_dir.iterdir()), [])
+
+            for i in range(5):
+                api._disk_cache_put(f'key{i}', f'answer {i}')
+            self.assertLessEqual(len(list(cache_dir.glob('*.json'))), 3)
+            self.assertEqual(api._disk_cache_get('key4'), 'answer 4')
+
+    def test_failed_disk_write_leaves_no_temp_file(self):
+        """Test that a failed atomic rename cleans up its temp file"""
+        import tempfile
+        from unittest.mock import patch
+        from agents.perplexity_api import PerplexityAPI
+
+        with tempfile.TemporaryDirectory() as tmp:
+            api = PerplexityAPI('test-key', self._config(tmp))
+            with patch('agents.perplexity_api.os.replace', side_effect=OSError('disk full')):
+                api._disk_cache_put('key', 'answer')
+
+            self.assertEqual(list(api.cache_dir.iterdir()), [])
+
+
+class TestPerplexityRetry(unittest.TestCase):
+    """Tests for PerplexityAPI retry handling"""
+
+    def _http_error(self, code, retry_after=None):
+        import io
+        import urllib.error
+        from email.message import Message
+
+        headers = Message()
+        if retry_after is not None:
+            headers['Retry-After'] = retry_after
+        return urllib.error.HTTPError('https://api', code, 'error', headers, io.BytesIO(b''))
+
+    def test_server_error_is_retried_honoring_retry_after(self):
+        """Test that a 503 is retried after the server's Retry-After delay"""
+        import json
+        from unittest.mock import patch
+        from agents.perplexity_api import PerplexityAPI
+
+        ok = json.dumps({'choices': [{'message': {'content': 'done'}}]}).encode('utf-8')
+        api = PerplexityAPI('test-key')
+        api._post = Mock(side_effect=[self._http_error(503, '7'), ok])
+
+        with patch('agents.perplexity_api.time.sleep') as sleep:
+            self.assertEqual(api.ask_perplexity('q'), 'done')
+
+        sleep.assert_called_once_with(7.0)
+
+    def test_large_retry_after_is_capped(self):
+        """Test that a huge Retry-After does not stall the caller"""
+        import json
+        from unittest.mock import patch
+        from agents.perplexity_api import PerplexityAPI
+
+        ok = json.dumps({'choices': [{'message': {'content': 'done'}}]}).encode('utf-8')
+        api = PerplexityAPI('test-key')
+        api._post = Mock(side_effect=[self._http_error(429, '3600'), ok])
+
+        with patch('agents.perplexity_api.time.sleep') as sleep:
+            self.assertEqual(api.ask_perplexity('q'), 'done')
+
+        sleep.assert_called_once_with(60.0)
+
+    def test_client_error_is_not_retried(self):
+        """Test that a 400 falls back immediately"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        api._post = Mock(side_effect=self._http_error(400))
+
+        self.assertIsNone(api.ask_perplexity('q'))
+        self.assertEqual(api._post.call_count, 1)
+
+    def test_retries_stop_at_limit(self):
+        """Test that persistent rate limiting gives up after retry_limit retries"""
+        from unittest.mock import patch
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        api._post = Mock(side_effect=self._http_error(429))
+
+        with patch('agents.perplexity_api.time.sleep'):
+            self.assertIsNone(api.ask_perplexity('q'))
+
+        self.assertEqual(api._post.call_count, api.retry_limit + 1)
+        bodies = {call.args[0] for call in api._post.call_args_list}
+        self.assertEqual(len(bodies), 1)
+
+
+class TestPerplexityStreaming(unittest.TestCase):
+    """Tests for streamed Perplexity code generation"""
+
+    def test_code_stream_stops_after_closing_fence(self):
+        """Test that reading stops once the code block is complete"""
+        from agents.perplexity_api import PerplexityAPI
+
+        consumed = []
+
+        def fake_stream(messages, max_tokens=1024):
+            for piece in ['``', '`python\nx = 1\n`', '``', '\nExplanation', ' more']:
+                consumed.append(piece)
+                yield piece
+
+        api = PerplexityAPI('test-key')
+        api._stream_request = fake_stream
+
+        code = api.get_code_from_perplexity('assign x')
+        self.assertEqual(code, '```python\nx = 1\n```')
+        self.assertEqual(len(consumed), 3)
+
+    def test_empty_stream_falls_back_to_request(self):
+        """Test fallback to a buffered request when streaming yields nothing"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        api._stream_request = lambda messages, max_tokens=1024: iter(())
+        api._make_request = Mock(return_value='buffered')
+
+        self.assertEqual(api.get_code_from_perplexity('anything'), 'buffered')
+
+    def test_cut_off_code_stream_falls_back_to_request(self):
+        """Test that a stream failing inside an open code block is not returned"""
+        from agents.perplexity_api import PerplexityAPI
+
+        def broken_stream(messages, max_tokens=1024):
+            yield '```python\ndef half('
+            raise ConnectionResetError('connection dropped')
+
+        api = PerplexityAPI('test-key')
+        api._stream_request = broken_stream
+        api._make_request = Mock(return_value='```python\ndef whole(): pass\n```')
+
+        self.assertEqual(api.get_code_from_perplexity('a function'), '```python\ndef whole(): pass\n```')
+        api._make_request.assert_called_once()
+
+    def test_ask_stream_yields_deltas_or_cached_answer(self):
+        """Test that questions stream, but cached answers skip the network"""
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        api._stream_request = Mock(side_effect=lambda messages, max_tokens=1024: iter(['Use ', 'pathlib']))
+        self.assertEqual(list(api.ask_perplexity_stream('paths?')), ['Use ', 'pathlib'])
+
+        messages = api._question_messages('paths?')
+        api._remember(api._cache_key(api._payload(messages)), 'cached answer')
+        self.assertEqual(list(api.ask_perplexity_stream('paths?')), ['cached answer'])
+        self.assertEqual(api._stream_request.call_count, 1)
+
+
+class TestPerplexityConnections(unittest.TestCase):
+    """Tests for the shared keep-alive connection pool"""
+
+    def test_instances_share_thread_connection(self):
+        """Test that separate instances reuse one connection per thread"""
+        import threading
+        from agents.perplexity_api import PerplexityAPI
+
+        first, second = PerplexityAPI('key-1'), PerplexityAPI('key-2')
+        conn = first._get_connection()
+        self.assertIs(second._get_connection(), conn)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(first._get_connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+        PerplexityAPI.close_all()
+        self.assertEqual(PerplexityAPI._open_connections, set())
+        second.close()
+        self.assertFalse(first._has_connection())
+
+    def test_thread_exit_closes_its_connections(self):
+        """Test that a finished thread's connections leave the pool"""
+        import threading
+        from agents.perplexity_api import PerplexityAPI
+
+        api = PerplexityAPI('test-key')
+        before = len(PerplexityAPI._open_connections)
+        opened = []
+
+        for _ in range(3):
+            thread = threading.Thread(target=lambda: opened.append(api._get_connection()))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(len(PerplexityAPI._open_connections), before)
+        self.assertTrue(all(conn.sock is None for conn in opened))
+
+
+class TestTodoPlanner(unittest.TestCase):
+    """Tests for TodoPlanner"""
+
+    def setUp(self):
+        import tempfile
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = Mock()
+        self.config.memory_dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_create_plans_researches_in_one_batch(self):
+        """Test that research for several requests is batched"""
+        from agents.todo_planner import TodoPlanner
+
+        perplexity = Mock()
+        perplexity.batch.side_effect = lambda calls: [call() for call in calls]
+        perplexity.research_topic.return_value = 'research'
+        model = Mock()
+        model.generate.return_value = "1. create app.py: main module\n2. test: run it"
+
+        planner = TodoPlanner(self.config, model, perplexity)
+        results = planner.create_plans(['build a stock scanner', 'add oauth login'])
+
+        perplexity.batch.assert_called_once()
+        self.assertEqual(perplexity.research_topic.call_count, 2)
+        self.assertEqual([r['total_tasks'] for r in results], [2, 2])
+        self.assertTrue(all(r['research_used'] for r in results))
+        self.assertEqual(len(planner.get_all_todos()), 4)
+
+    def test_simple_requests_skip_research(self):
+        """Test that short requests without research keywords stay local"""
+        from agents.todo_planner import TodoPlanner
+
+        perplexity = Mock()
+        perplexity.batch.side_effect = lambda calls: [call() for call in calls]
+        perplexity.research_topic.return_value = 'research'
+        model = Mock()
+        model.generate.return_value = "1. create hello.py: print hello"
+
+        planner = TodoPlanner(self.config, model, perplexity)
+        self.assertFalse(planner.create_plan('create hello.py')['research_used'])
+        perplexity.research_topic.assert_not_called()
+
+        results = planner.create_plans(['create hello.py', 'call the weather API'])
+        self.assertEqual([r['research_used'] for r in results], [False, True])
+        self.assertEqual(perplexity.research_topic.call_count, 1)
+
+    def _planner_with_todos(self, count=3):
+        from agents.todo_planner import TodoPlanner
+
+        model = Mock()
+        model.generate.return_value = "\n".join(
+            f"{i}. create file{i}.py: part {i}" for i in range(1, count + 1)
+        )
+        planner = TodoPlanner(self.config, model)
+        planner.create_plan('build it')
+        return planner
+
+    def test_mutations_replay_from_log(self):
+        """Test that logged mutations are restored by a new planner"""
+        from agents.todo_planner import TodoPlanner
+
+        planner = self._planner_with_todos()
+        planner.mark_completed(0)
+        planner.mark_failed(1, 'boom')
+        planner.add_note(2, 'remember this')
+
+        reloaded = TodoPlanner(self.config, Mock())
+        self.assertEqual(reloaded.get_all_todos(), planner.get_all_todos())
+        self.assertEqual(reloaded.todos[1]['error'], 'boom')
+        self.assertEqual(reloaded.todos[2]['notes'][0]['note'], 'remember this')
+
+    def test_compaction_keeps_state(self):
+        """Test that a snapshot plus stale log events does not double-apply"""
+        from agents.todo_planner import TodoPlanner
+
+        planner = self._planner_with_todos()
+        planner.mark_completed(0)
+        log_copy = planner.todos_log.read_text()
+        planner._save_todos()
+        self.assertEqual(planner.todos_log.read_text(), '')
+
+        # Simulate a crash between writing the snapshot and truncating the log
+        planner.todos_log.write_text(log_copy)
+        reloaded = TodoPlanner(self.config, Mock())
+        self.assertEqual(reloaded.get_all_todos(), planner.get_all_todos())
+
+    def test_loads_legacy_list_format(self):
+        """Test that a pre-log todos.json list still loads"""
+        import json
+        from agents.todo_planner import TodoPlanner
+
+        legacy = [{'action': 'edit', 'file': 'a.py', 'description': 'x', 'status': 'pending'}]
+        (self.config.memory_dir / 'todos.json').write_text(json.dumps(legacy))
+
+        planner = TodoPlanner(self.config, Mock())
+        self.assertEqual(planner.get_all_todos(), legacy)
+
+    def test_save_skips_clean_state(self):
+        """Test that snapshots are only rewritten after a change"""
+        planner = self._planner_with_todos()
+        planner._save_todos()
+        planner.todos_file.write_text('sentinel')
+
+        planner.clear_completed()
+        planner._save_todos()
+        self.assertEqual(planner.todos_file.read_text(), 'sentinel')
+        self.assertEqual(planner.todos_log.read_text(), '')
+
+        planner.mark_completed(0)
+        planner._save_todos()
+        self.assertNotEqual(planner.todos_file.read_text(), 'sentinel')
+
+    def test_pending_index_follows_mutations(self):
+        """Test next/pending lookups after completion, clearing and reload"""
+        from agents.todo_planner import TodoPlanner
+
+        planner = self._planner_with_todos(4)
+        self.assertIs(planner.get_next_task(), planner.todos[0])
+        planner.mark_completed(0)
+        planner.mark_failed(1, 'boom')
+        self.assertIs(planner.get_next_task(), planner.todos[2])
+        self.assertEqual([t['file'] for t in planner.get_pending_todos()], ['file3.py', 'file4.py'])
+
+        planner.clear_completed()
+        self.assertEqual(planner.get_next_task()['file'], 'file3.py')
+        planner.mark_completed(1)
+        self.assertEqual([t['file'] for t in planner.get_pending_todos()], ['file4.py'])
+
+        reloaded = TodoPlanner(self.config, Mock())
+        self.assertEqual(reloaded.get_next_task()['file'], 'file4.py')
+        reloaded.clear_all()
+        self.assertIsNone(reloaded.get_next_task())
+        self.assertEqual(reloaded.get_pending_todos(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,6 +42,18 @@ class TestChunkedExecutor(unittest.TestCase):
         self.assertEqual(len(plan.chunks), 1)
         self.assertEqual(plan.chunks[0].chunk_type, ChunkType.SINGLE_FILE)
 
+    def test_keywords_match_whole_words(self):
+        """Test that keywords inside other words do not change the plan"""
+        from core.chunked_executor import ChunkedTaskExecutor, ChunkType
+
+        executor = ChunkedTaskExecutor()
+        plan = executor.analyze_task("build a rapid feedback guide generator")
+        self.assertEqual(plan.chunks[0].chunk_type, ChunkType.SINGLE_FILE)
+
+        plan = executor.analyze_task("create REST APIs with a user interface")
+        self.assertTrue(plan.metadata['is_backend'])
+        self.assertTrue(plan.metadata['is_frontend'])
+
     def test_chunk_dependencies(self):
         """Test that chunk dependencies are properly set"""
         from core.chunked_executor import ChunkedTaskExecutor
@@ -73,6 +85,30 @@ class TestChunkedExecutor(unittest.TestCase):
         # Execution order should be valid
         self.assertEqual(len(plan.execution_order), len(plan.chunks))
 
+    def test_cyclic_dependencies_are_reported(self):
+        """Test that a dependency cycle is caught before any generation"""
+        from core.chunked_executor import ChunkedTaskExecutor, CodeChunk, ChunkType
+
+        executor = ChunkedTaskExecutor()
+        chunks = [
+            CodeChunk("a", ChunkType.UTILITY, "A", "a.py", dependencies=["b"]),
+            CodeChunk("b", ChunkType.UTILITY, "B", "b.py", dependencies=["a"]),
+            CodeChunk("c", ChunkType.UTILITY, "C", "c.py"),
+        ]
+        with self.assertRaisesRegex(ValueError, "a, b"):
+            executor._topological_sort(chunks)
+
+        executor._plan_single_file = lambda task, task_lower=None: chunks
+        plan = executor.analyze_task("make something")
+        self.assertIn("cycle", plan.metadata['error'])
+        self.assertIn("cycle", executor.get_plan_summary(plan))
+
+        coder = Mock()
+        executor.set_coder(coder)
+        result = executor.execute_plan(plan)
+        self.assertFalse(result['success'])
+        coder.generate.assert_not_called()
+
     def test_time_estimation(self):
         """Test generation time estimation"""
         from core.chunked_executor import ChunkedTaskExecutor
@@ -85,6 +121,190 @@ class TestChunkedExecutor(unittest.TestCase):
         # At 5 tok/s, even small tasks should take some time
         self.assertLess(plan.estimated_total_time, 600)  # Less than 10 minutes
 
+    def test_concurrent_execution_respects_dependencies(self):
+        """Test parallel chunk generation for coders that support it"""
+        import threading
+        import time
+        from core.chunked_executor import ChunkedTaskExecutor, ProgressCallback
+
+        class ConcurrentCoder:
+            supports_concurrent = True
+
+            def __init__(self):
+                self.lock = threading.Lock()
+                self.active = 0
+                self.peak = 0
+
+            def generate(self, prompt, **kwargs):
+                with self.lock:
+                    self.active += 1
+                    self.peak = max(self.peak, self.active)
+                time.sleep(0.02)
+                with self.lock:
+                    self.active -= 1
+                return "```python\nprint('ok')\n```"
+
+        coder = ConcurrentCoder()
+        executor = ChunkedTaskExecutor(coder)
+        executor.set_progress_callback(ProgressCallback())
+        plan = executor.analyze_task("create a full-stack web app with Flask and SQLite database")
+
+        chunk_map = {c.chunk_id: c for c in plan.chunks}
+        original = executor._generate_chunk
+
+        def generate_chunk(chunk, task):
+            for dep in chunk.dependencies:
+                self.assertEqual(chunk_map[dep].status, "completed")
+            return original(chunk, task)
+
+        executor._generate_chunk = generate_chunk
+        result = executor.execute_plan(plan)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(sorted(result['completed_chunks']), sorted(plan.execution_order))
+        self.assertGreater(coder.peak, 1)
+
+    def test_fused_chunks_share_one_generation(self):
+        """Test that a fuse group is generated with a single call"""
+        from core.chunked_executor import ChunkedTaskExecutor, ProgressCallback
+
+        def generate(prompt, **kwargs):
+            if "--- FILE:" in prompt:
+                return "from flask import Flask\n--- FILE: init_db.py ---\n```python\ninit()\n```"
+            return "x = 1"
+
+        coder = Mock()
+        coder.supports_concurrent = False
+        coder.generate.side_effect = generate
+
+        executor = ChunkedTaskExecutor(coder)
+        executor.set_progress_callback(ProgressCallback())
+        plan = executor.analyze_task("create a full-stack web app with Flask and SQLite database")
+        result = executor.execute_plan(plan)
+
+        self.assertTrue(result['success'])
+        self.assertEqual(result['files']['app.py'], "from flask import Flask")
+        self.assertEqual(result['files']['init_db.py'], "init()")
+        self.assertEqual(coder.generate.call_count, len(plan.chunks) - 1)
+
+    def test_chunk_prompts_share_task_prefix(self):
+        """Test that prompts open with the task so backends can reuse the prefix"""
+        from core.chunked_executor import ChunkedTaskExecutor
+
+        executor = ChunkedTaskExecutor()
+        task = "create a full-stack web app with Flask and SQLite database"
+        plan = executor.analyze_task(task)
+
+        prefix = f"Task: {task}\n\n"
+        for chunk in plan.chunks:
+            prompt = executor._build_chunk_prompt(chunk, task)
+            self.assertTrue(prompt.startswith(prefix))
+            self.assertEqual(prompt.count(task), 1)
+
+    def test_checkpoints_resume_without_regeneration(self):
+        """Test that a rerun restores checkpointed chunks instead of generating them"""
+        import tempfile
+        from core.chunked_executor import ChunkedTaskExecutor, ProgressCallback
+
+        task = "create a webpage with html and css"
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            for concurrent in (False, True):
+                coder = Mock()
+                coder.supports_concurrent = concurrent
+                coder.generate.side_effect = (
+                    lambda prompt, **kwargs: "" if "Write JavaScript" in prompt else "x = 1")
+                executor = ChunkedTaskExecutor(coder)
+                executor.set_progress_callback(ProgressCallback())
+
+                first = executor.execute_plan(executor.analyze_task(task),
+                                              checkpoint_dir=checkpoint_dir)
+                self.assertEqual(first['failed_chunks'], ['frontend_js'])
+
+                coder.generate.reset_mock()
+                coder.generate.side_effect = lambda prompt, **kwargs: "y = 2"
+                second = executor.execute_plan(executor.analyze_task(task),
+                                               checkpoint_dir=checkpoint_dir)
+
+                self.assertTrue(second['success'])
+                self.assertEqual(coder.generate.call_count, 1)
+                self.assertEqual(second['files']['index.html'], "x = 1")
+                self.assertEqual(second['files']['script.js'], "y = 2")
+
+                # A different task must not pick up these checkpoints
+                other = executor.execute_plan(executor.analyze_task(task + " and js"),
+                                              checkpoint_dir=checkpoint_dir)
+                self.assertEqual(other['files']['index.html'], "y = 2")
+                for name in ('frontend_html', 'frontend_css', 'frontend_js'):
+                    Path(checkpoint_dir, f"{name}.json").unlink()
+
+    def test_chunk_files_written_before_return(self):
+        """Test that background file writes are flushed by execute_plan"""
+        from core.chunked_executor import ChunkedTaskExecutor, ProgressCallback
+
+        coder = Mock()
+        coder.supports_concurrent = False
+        coder.generate.return_value = "x = 1"
+        file_tools = Mock()
+        file_tools.write_file.return_value = {'success': True}
+
+        executor = ChunkedTaskExecutor(coder, file_tools)
+        executor.set_progress_callback(ProgressCallback())
+        plan = executor.analyze_task("create a webpage with html and css")
+        executor.execute_plan(plan)
+
+        written = sorted(call.args[0] for call in file_tools.write_file.call_args_list)
+        self.assertEqual(written, ['index.html', 'script.js', 'style.css'])
+        self.assertIsNone(executor._writer)
+
+    def test_speed_calibrates_from_completed_chunks(self):
+        """Test that observed generation speed refines the estimates"""
+        from core.chunked_executor import (
+            ChunkedTaskExecutor, ProgressCallback, estimate_generation_time
+        )
+
+        coder = Mock()
+        coder.supports_concurrent = False
+        coder.generate.return_value = "x = 1\n" * 100
+
+        executor = ChunkedTaskExecutor(coder)
+        executor.set_progress_callback(ProgressCallback())
+        plan = executor.analyze_task("create a webpage with html and css")
+        initial_eta = executor.get_eta(plan)
+        self.assertAlmostEqual(initial_eta, plan.estimated_total_time)
+
+        executor.execute_plan(plan)
+
+        self.assertNotEqual(executor.tokens_per_second, executor.TOKENS_PER_SECOND_CPU)
+        self.assertEqual(executor.get_eta(plan), 0.0)
+        self.assertLess(plan.estimated_total_time, initial_eta)
+
+        task = "create a calculator"
+        self.assertAlmostEqual(estimate_generation_time(task, tokens_per_second=10.0) * 2,
+                               estimate_generation_time(task, tokens_per_second=5.0))
+
+    def test_failed_chunk_skips_dependents(self):
+        """Test that dependents of a failed chunk are skipped in both modes"""
+        from core.chunked_executor import ChunkedTaskExecutor, ProgressCallback
+
+        for concurrent in (False, True):
+            coder = Mock()
+            coder.supports_concurrent = concurrent
+            coder.generate.side_effect = (
+                lambda prompt, **kwargs: "" if "HTML" in prompt else "x = 1")
+
+            executor = ChunkedTaskExecutor(coder)
+            executor.set_progress_callback(ProgressCallback())
+            plan = executor.analyze_task("create a webpage with html and css")
+            result = executor.execute_plan(plan)
+
+            self.assertFalse(result['success'])
+            statuses = {c.chunk_id: c.status for c in plan.chunks}
+            self.assertEqual(statuses, {
+                'frontend_html': 'failed',
+                'frontend_css': 'completed',
+                'frontend_js': 'skipped',
+            })
+
 
 class TestProgressTracker(unittest.TestCase):
     """Tests for ProgressTracker"""
@@ -375,6 +595,31 @@ class TestModelLifecycle(unittest.TestCase):
         self.assertAlmostEqual(estimate, 20.0, delta=5)
 
 
+class TestPrimaryCoderStreaming(unittest.TestCase):
+    """Tests for token streaming from PrimaryCoder"""
+
+    def test_generate_stream_yields_tokens(self):
+        """Test that tokens are yielded as llama-cpp produces them"""
+        import tempfile
+        from models.coder import PrimaryCoder
+
+        with tempfile.NamedTemporaryFile(suffix='.gguf') as model_file:
+            coder = PrimaryCoder(Path(model_file.name), {})
+            coder.load()
+            coder._model = Mock(return_value=iter([
+                {'choices': [{'text': 'def '}]},
+                {'choices': [{'text': ''}]},
+                {'choices': [{'text': 'f(): pass'}]},
+            ]))
+
+            tokens = list(coder.generate_stream('write f', temperature=None, max_tokens=None))
+
+        self.assertEqual(tokens, ['def ', 'f(): pass'])
+        kwargs = coder._model.call_args.kwargs
+        self.assertTrue(kwargs['stream'])
+        self.assertEqual((kwargs['temperature'], kwargs['max_tokens']), (0.3, 256))
+
+
 if __name__ == '__main__':
     # Run tests with verbose output
     unittest.main(verbosity=2)
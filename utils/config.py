@@ -52,7 +52,12 @@ class Config:
             'enabled': True,
             'retry_limit': 3,
             'timeout_seconds': 30,
-            'fallback_to_local': True
+            'fallback_to_local': True,
+            'max_concurrent_requests': 4,
+            'cache_size': 128,
+            'disk_cache': True,
+            'cache_ttl_seconds': 86400,
+            'disk_cache_max_files': 512
         })
 
         # Feature toggles